@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import Response
+from app.config import get_settings
+from app.services.resume_service import resume_service
+from app.tracing import span
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class RenderedResponse:
+    """A JSON payload serialized once, with pre-compressed variants"""
+    body: bytes
+    digest: str
+    gzip: Optional[bytes]
+    br: Optional[bytes]
+
+
+def render_json(payload: Any) -> RenderedResponse:
+    """Serialize a payload to JSON bytes and pre-compress it"""
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+    brotlied = brotli.compress(body, quality=11) if brotli is not None else None
+    return RenderedResponse(
+        body=body,
+        digest=hashlib.sha256(body).hexdigest()[:32],
+        # Keep a variant only if it actually saves bytes
+        gzip=gzipped if len(gzipped) < len(body) else None,
+        br=brotlied if brotlied is not None and len(brotlied) < len(body) else None
+    )
+
+
+# name -> (resume version, rendered payload)
+_rendered: Dict[str, Tuple[str, RenderedResponse]] = {}
+
+
+async def get_rendered(name: str, build: Callable[[], Awaitable[Any]]) -> RenderedResponse:
+    """Rendered payload for the current resume version, built on first use"""
+    version = resume_service.version
+    cached = _rendered.get(name)
+    if cached is None or cached[0] != version:
+        with span(f"render.{name}"):
+            cached = (version, render_json(await build()))
+        _rendered[name] = cached
+    return cached[1]
+
+
+def _accepted_encodings(header: str) -> set:
+    """Content codings the client accepts (q=0 excluded)"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if if_none_match.strip() == '*':
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def conditional_response(request: Request, rendered: RenderedResponse) -> Response:
+    """Serve the best encoding for the client, or 304 if its cached copy is current"""
+    accepted = _accepted_encodings(request.headers.get('accept-encoding', ''))
+    if rendered.br is not None and 'br' in accepted:
+        encoding, body = 'br', rendered.br
+    elif rendered.gzip is not None and ('gzip' in accepted or '*' in accepted):
+        encoding, body = 'gzip', rendered.gzip
+    else:
+        encoding, body = None, rendered.body
+    
+    # Each encoding is a different representation, so each gets its own strong ETag
+    etag = f'"{rendered.digest}-{encoding}"' if encoding else f'"{rendered.digest}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': settings.static_cache_control,
+        'Vary': 'Accept-Encoding'
+    }
+    
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+async def cached_json_response(
+    request: Request,
+    name: str,
+    build: Callable[[], Awaitable[Any]]
+) -> Response:
+    """Pre-serialized, ETag-validated response for a resume-derived payload"""
+    return conditional_response(request, await get_rendered(name, build))
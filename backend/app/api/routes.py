@@ -1,63 +1,195 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import Awaitable, List, TypeVar
 from app.models.schemas import (
     Profile, Experience, Project, Skill,
     ChatMessage, ChatResponse
 )
 from app.services.resume_service import resume_service
+from app.services.answer_cache import answer_cache
 from app.services.chat_service import chat_service
+from app.services.conversation import conversation_summarizer
+from app.services.generation_policy import generation_policy
+from app.services.history_cache import history_cache
+from app.services.history_writer import history_writer
+from app.services.intent_router import intent_router
+from app.services.model_warmer import model_warmer
+from app.services.ollama_router import ollama_router
+from app.services.scheduler import AdmissionRejected, llm_scheduler
+from app.services.single_flight import single_flight
+from app.storage.factory import chat_history_store
+from app.api.cached_responses import cached_json_response
 
 router = APIRouter()
 
+# Status logged for requests whose client went away (nginx convention); never seen by the client
+CLIENT_CLOSED_REQUEST = 499
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """The client closed the connection before the response was ready"""
+
+
+async def _wait_for_disconnect(request: Request):
+    # The body has already been read, so the next ASGI message is the disconnect
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _unless_disconnected(request: Request, work: Awaitable[T]) -> T:
+    """Await work, cancelling it (and the Ollama call behind it) if the client disconnects first"""
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.create_task(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+    if not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        raise ClientDisconnected()
+    return task.result()
+
+
+def _overloaded(e: AdmissionRejected) -> HTTPException:
+    """503 telling the client when to retry"""
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+def _format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
 @router.get("/profile", response_model=dict)
-async def get_profile():
+async def get_profile(request: Request):
     """Get profile information"""
     try:
-        profile = await resume_service.get_profile()
-        return profile
+        return await cached_json_response(request, "profile", resume_service.get_profile)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/experiences", response_model=List[dict])
-async def get_experiences():
+async def get_experiences(request: Request):
     """Get work experiences"""
     try:
-        experiences = await resume_service.get_experiences()
-        return experiences
+        return await cached_json_response(request, "experiences", resume_service.get_experiences)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/projects", response_model=List[dict])
-async def get_projects():
+async def get_projects(request: Request):
     """Get projects"""
     try:
-        projects = await resume_service.get_projects()
-        return projects
+        return await cached_json_response(request, "projects", resume_service.get_projects)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/skills", response_model=List[dict])
-async def get_skills():
+async def get_skills(request: Request):
     """Get skills"""
     try:
-        skills = await resume_service.get_skills()
-        return skills
+        return await cached_json_response(request, "skills", resume_service.get_skills)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/bootstrap", response_model=dict)
+async def get_bootstrap(request: Request):
+    """Get profile, experiences, projects and skills in a single response"""
+    try:
+        return await cached_json_response(request, "bootstrap", resume_service.get_bootstrap)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat(message: ChatMessage):
+async def chat(message: ChatMessage, request: Request):
     """Send a chat message and get AI response"""
     try:
-        response, session_id = await chat_service.get_ai_response(
+        response, session_id = await _unless_disconnected(request, chat_service.get_ai_response(
             message.message,
             message.session_id
-        )
+        ))
         return ChatResponse(response=response, session_id=session_id)
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stats", response_model=dict)
+async def get_stats():
+    """Get in-process cache and queue counters"""
+    return {
+        "history_cache": history_cache.stats(),
+        "history_writer": {**history_writer.stats, "pending": history_writer.pending, "store": chat_history_store.name},
+        "context": chat_service.get_context_stats(),
+        "chat_turns": chat_service.turn_stats,
+        "generation": generation_policy.get_stats(),
+        "answer_cache": answer_cache.stats(),
+        "intent_router": intent_router.stats(),
+        "conversation_summaries": conversation_summarizer.get_stats(),
+        "model": model_warmer.get_stats(),
+        "ollama_backends": ollama_router.get_stats(),
+        "llm_queue": llm_scheduler.get_stats(),
+        "single_flight": single_flight.get_stats()
+    }
+
+
+@router.post("/chat/warm", response_model=dict)
+async def warm_chat():
+    """Start loading the model (e.g. when the chat widget opens) without waiting for it"""
+    try:
+        return {"status": await chat_service.warm_up()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/chat/stream")
+async def chat_stream(message: ChatMessage, request: Request):
+    """Send a chat message and stream the AI response as Server-Sent Events"""
+    events = chat_service.stream_ai_response(message.message, message.session_id)
+    
+    # Pull the first event before committing to a 200 so a saturated queue is a plain 503.
+    # Once streaming, Starlette cancels the response when the client disconnects
+    try:
+        first = await _unless_disconnected(request, events.__anext__())
+    except ClientDisconnected:
+        await events.aclose()
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    
+    async def event_stream():
+        try:
+            yield _format_sse(*first)
+            async for event, data in events:
+                yield _format_sse(event, data)
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -1,18 +1,134 @@
 from pydantic_settings import BaseSettings
+from typing import List
 from functools import lru_cache
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
     
-    # Supabase
-    supabase_url: str
-    supabase_key: str
+    # Supabase (only needed when chat_history_backend is "supabase")
+    supabase_url: str = ""
+    supabase_key: str = ""
+    
+    # Chat history storage: "supabase" (hosted) or "sqlite" (a local file, for single-node
+    # deployments; no network round-trip per turn)
+    chat_history_backend: str = "supabase"
+    sqlite_path: str = "data/chat_history.db"
+    sqlite_busy_timeout: float = 5.0
+    
+    # Max concurrent Supabase calls (size of the database thread pool)
+    db_max_concurrency: int = 8
+    
+    # Write-behind chat_history persistence
+    history_write_batch_size: int = 50
+    history_flush_interval: float = 1.0
+    history_max_pending: int = 5000
+    history_retry_initial_backoff: float = 0.5
+    history_retry_max_backoff: float = 30.0
+    history_shutdown_flush_attempts: int = 3
+    
+    # Session history cache in front of chat_history reads
+    history_cache_max_sessions: int = 2000
+    history_cache_idle_ttl: float = 1800.0
+    history_cache_max_bytes: int = 32 * 1024 * 1024
+    history_cache_max_messages: int = 50
+    
+    # Conversation window: recent turns are kept up to this many (estimated) tokens;
+    # older turns are folded into a running summary generated in the background
+    history_token_budget: int = 1024
+    history_summary_enabled: bool = True
+    history_summary_max_tokens: int = 200
     
     # Ollama
     ollama_url: str = "http://localhost:11434"
     ollama_model: str = "gemma2:2b"
     
+    # Several Ollama servers: comma-separated base URLs (overrides ollama_url when set).
+    # A backend is ejected after ollama_eject_after_failures consecutive connection errors
+    # or a failed health probe, and rejoins when a probe succeeds
+    ollama_backend_urls: str = ""
+    ollama_eject_after_failures: int = 3
+    ollama_health_interval: float = 10.0
+    ollama_health_timeout: float = 2.0
+    
+    # Ollama HTTP client (shared connection pool; timeouts in seconds)
+    ollama_connect_timeout: float = 5.0
+    ollama_read_timeout: float = 120.0
+    ollama_write_timeout: float = 10.0
+    ollama_pool_timeout: float = 10.0
+    ollama_max_connections: int = 20
+    ollama_max_keepalive_connections: int = 10
+    ollama_keepalive_expiry: float = 60.0
+    ollama_http2: bool = True  # used only when the 'h2' package is installed
+    
+    # Model residency: keep_alive is sent with every request, as a duration ("30m", "1h30m")
+    # or seconds ("3600"; "-1" = forever); an invalid value stops the app at startup.
+    # A turn whose model load took at least ollama_cold_load_threshold seconds counts as cold
+    ollama_keep_alive: str = "30m"
+    ollama_warmup_on_startup: bool = True
+    ollama_cold_load_threshold: float = 0.5
+    
+    # LLM admission control: at most llm_max_in_flight generations run at once, up to
+    # llm_max_queue more wait llm_queue_timeout seconds for a slot, the rest get a 503.
+    # llm_retry_after is the Retry-After hint until real generation times are known
+    llm_max_in_flight: int = 2
+    llm_max_queue: int = 16
+    llm_queue_timeout: float = 30.0
+    llm_retry_after: int = 10
+    
+    # Generation options per question class (short factual / list or overview / open-ended).
+    # With generation_adaptive off every turn uses the open-ended profile.
+    # Stop lists are JSON in the environment, e.g. GENERATION_SHORT_STOP='["\n\n"]'
+    generation_adaptive: bool = True
+    generation_short_num_predict: int = 160
+    generation_short_temperature: float = 0.3
+    generation_short_stop: List[str] = []
+    generation_list_num_predict: int = 350
+    generation_list_temperature: float = 0.5
+    generation_list_stop: List[str] = []
+    generation_open_num_predict: int = 500
+    generation_open_temperature: float = 0.7
+    generation_open_stop: List[str] = []
+    
+    # Chat streaming: max tokens buffered between Ollama and a slow SSE client
+    chat_stream_buffer_size: int = 64
+    
+    # When a visitor disconnects mid-reply the generation is cancelled; keep the
+    # partial reply in the chat history (True) or drop it (False)
+    chat_persist_partial_replies: bool = False
+    
+    # Resume knowledge hot reload: "off" or "poll" (check file mtime every interval seconds)
+    resume_reload_mode: str = "off"
+    resume_reload_interval: float = 2.0
+    
+    # Resume context in the system prompt: "full" (whole resume) or "retrieved"
+    # (compact header plus the retrieval_top_k sections most relevant to the question)
+    resume_context_mode: str = "full"
+    retrieval_top_k: int = 4
+    
+    # Answer structured questions (contact, CGPA, projects, ...) from resume data without the model
+    intent_router_enabled: bool = True
+    
+    # Share one generation between concurrent identical first-turn questions
+    chat_single_flight_enabled: bool = True
+    
+    # Exact-match answer cache for first-turn questions
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: int = 500
+    answer_cache_ttl: float = 6 * 3600.0
+    answer_cache_max_bytes: int = 4 * 1024 * 1024
+    
+    # Request tracing: fraction of requests traced (0 disables it). Sampled responses carry a
+    # Server-Timing header; finished traces go to tracing_exporter ("none", "file" or "otlp")
+    tracing_sample_rate: float = 0.0
+    tracing_exporter: str = "none"
+    tracing_file_path: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_service_name: str = "portfolio-chat-api"
+    
+    # Cache-Control for the pre-serialized profile/experiences/projects/skills responses
+    static_cache_control: str = "public, max-age=300"
+    
     # CORS
     frontend_url: str = "http://localhost:5173"
     
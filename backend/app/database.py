@@ -1,12 +1,48 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
 from supabase import create_client, Client
 from app.config import get_settings
 
 settings = get_settings()
 
-# Initialize Supabase client
-supabase: Client = create_client(settings.supabase_url, settings.supabase_key)
+# Supabase client, created on first use so the app can run without credentials
+# when chat history is stored locally
+supabase: Optional[Client] = None
+
+# supabase-py is synchronous, so every call runs on this bounded pool instead of
+# the event loop. max_workers is the cap on concurrent Supabase requests.
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+T = TypeVar("T")
 
 
 def get_supabase() -> Client:
     """Get Supabase client instance"""
+    global supabase
+    if supabase is None:
+        if not settings.supabase_url or not settings.supabase_key:
+            raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set to use Supabase")
+        supabase = create_client(settings.supabase_url, settings.supabase_key)
     return supabase
+
+
+async def run_db(fn: Callable[[], T]) -> T:
+    """Run a blocking Supabase call on the database thread pool"""
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(
+            max_workers=settings.db_max_concurrency,
+            thread_name_prefix="supabase"
+        )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, fn)
+
+
+def shutdown_db_executor():
+    """Wait for in-flight database calls and stop the thread pool (called on app shutdown)"""
+    global _db_executor
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
+
@@ -0,0 +1,55 @@
+import importlib.util
+import httpx
+from typing import Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+# Shared Ollama client, opened and closed by the app lifespan
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (pip install httpx[http2])"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP client configured from Settings"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            connect=settings.ollama_connect_timeout,
+            read=settings.ollama_read_timeout,
+            write=settings.ollama_write_timeout,
+            pool=settings.ollama_pool_timeout
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.ollama_max_connections,
+            max_keepalive_connections=settings.ollama_max_keepalive_connections,
+            keepalive_expiry=settings.ollama_keepalive_expiry
+        ),
+        http2=settings.ollama_http2 and _http2_available()
+    )
+
+
+async def start_http_client():
+    """Open the shared client (called on app startup)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+
+
+async def close_http_client():
+    """Close the shared client and its pooled connections (called on app shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it lazily when used outside the app lifespan"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
@@ -1,15 +1,53 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.routes import router
 from app.config import get_settings
+from app.database import shutdown_db_executor
+from app.http_client import start_http_client, close_http_client
+from app.metrics import MetricsMiddleware, registry
+from app.tracing import TracingMiddleware, trace_exporter
+from app.services.conversation import conversation_summarizer
+from app.services.chat_service import chat_service
+from app.services.history_writer import history_writer
+from app.services.model_warmer import model_warmer
+from app.services.ollama_router import ollama_router
+from app.services.resume_service import resume_service
+from app.storage.factory import chat_history_store
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown"""
+    await start_http_client()
+    await trace_exporter.start()
+    await history_writer.start()
+    await resume_service.start_watcher()
+    await ollama_router.start()
+    if settings.ollama_warmup_on_startup:
+        # Runs in the background: a missing Ollama must not hold up startup
+        await chat_service.warm_up()
+    yield
+    await model_warmer.stop()
+    await ollama_router.stop()
+    await resume_service.stop_watcher()
+    await conversation_summarizer.stop()
+    await history_writer.stop()
+    await chat_history_store.close()
+    await trace_exporter.stop()
+    await close_http_client()
+    shutdown_db_executor()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Portfolio AI Chat API",
     description="Backend API for AI-powered portfolio website",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -21,6 +59,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count and time every request per route (added after CORS, so it wraps it)
+app.add_middleware(MetricsMiddleware)
+
+# Sampled request traces with a Server-Timing summary; a pass-through at sample rate 0
+app.add_middleware(
+    TracingMiddleware,
+    sample_rate=settings.tracing_sample_rate,
+    exporter=trace_exporter,
+    timing_allow_origin=settings.frontend_url
+)
+
 # Include API routes
 app.include_router(router, prefix="/api", tags=["api"])
 
@@ -41,6 +90,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,224 @@
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cached JSON responses up to long generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Throughput buckets in tokens per second
+RATE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base for metrics with an optional fixed set of label names"""
+    
+    type = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+    
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def samples(self) -> Iterator[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """(suffix, label names, label values, value) for each exposed sample"""
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+    
+    def samples(self):
+        for key, value in self._values.items():
+            yield "_total", self.labelnames, key, value
+
+
+class Histogram(Metric):
+    type = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+    
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+    
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+    
+    def samples(self):
+        names = self.labelnames + ("le",)
+        for key, series in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                yield "_bucket", names, key + (_format_value(float(bound)),), cumulative
+            yield "_count", self.labelnames, key, cumulative
+            yield "_sum", self.labelnames, key, series[-1]
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter read from existing in-process stats when scraped"""
+    
+    def __init__(self, name: str, documentation: str, read: Callable[[], Dict[LabelValues, float]], labelnames: Sequence[str] = (), type: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.type = type
+        self._read = read
+    
+    def samples(self):
+        suffix = "_total" if self.type == "counter" else ""
+        for key, value in self._read().items():
+            yield suffix, self.labelnames, key, value
+
+
+class Registry:
+    """Collects metrics and renders them in the Prometheus text exposition format"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+    
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def callback(self, name: str, documentation: str, read: Callable[[], Dict[LabelValues, float]], labelnames: Sequence[str] = (), type: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, read, labelnames, type))
+    
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+registry = Registry()
+
+# Application metrics
+HTTP_REQUESTS = registry.counter(
+    "http_requests", "HTTP requests by route and status", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency, including streamed bodies", ("method", "route")
+)
+CHAT_TURNS = registry.counter(
+    "chat_turns", "Chat turns by answer source and outcome", ("source", "outcome")
+)
+CHAT_STAGE_DURATION = registry.histogram(
+    "chat_stage_duration_seconds",
+    "Time spent per chat turn stage: history, context, queue_wait, ttft, generation, persistence",
+    ("stage",)
+)
+OLLAMA_TOKENS = registry.counter(
+    "ollama_tokens", "Tokens processed by Ollama (prompt = prefill, eval = generated)", ("kind",)
+)
+OLLAMA_TOKENS_PER_SECOND = registry.histogram(
+    "ollama_tokens_per_second", "Ollama throughput per turn (prompt = prefill, eval = decode)", ("kind",), RATE_BUCKETS
+)
+HISTORY_FLUSH_DURATION = registry.histogram(
+    "history_flush_duration_seconds", "Chat history batch insert latency", ("outcome",)
+)
+
+
+def record_ollama_stats(ollama_stats: Dict[str, float]):
+    """Token counts and rates from the final chunk of an Ollama chat response (durations in ns)"""
+    for kind, count_field, duration_field in (
+        ("prompt", "prompt_eval_count", "prompt_eval_duration"),
+        ("eval", "eval_count", "eval_duration")
+    ):
+        count = ollama_stats.get(count_field)
+        if not count:
+            continue
+        OLLAMA_TOKENS.inc(count, kind=kind)
+        duration = ollama_stats.get(duration_field)
+        if duration:
+            OLLAMA_TOKENS_PER_SECOND.observe(count / (duration / 1e9), kind=kind)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route template"""
+    
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        status: Optional[int] = None
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=route_label)
+            HTTP_REQUESTS.inc(method=method, route=route_label, status=str(status or 500))
@@ -0,0 +1,52 @@
+import re
+from typing import Dict, Optional
+from app.config import get_settings
+from app.services.cache import LRUTTLCache
+
+settings = get_settings()
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Fold case, punctuation and whitespace so trivially different phrasings share a key"""
+    text = _PUNCTUATION_RE.sub(" ", text.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class AnswerCache:
+    """Exact-match cache of model answers to first-turn questions"""
+    
+    def __init__(self, max_entries: int, ttl: float, max_bytes: int):
+        self._cache = LRUTTLCache(
+            max_entries=max_entries,
+            ttl=ttl,
+            max_bytes=max_bytes,
+            sizeof=len,
+            sliding=False
+        )
+    
+    @staticmethod
+    def key(question: str, resume_version: str, model: str) -> tuple:
+        """Answers are only reused for the same resume content and the same model"""
+        return (normalize_question(question), resume_version, model)
+    
+    def get(self, question: str, resume_version: str, model: str) -> Optional[str]:
+        return self._cache.get(self.key(question, resume_version, model))
+    
+    def put(self, question: str, resume_version: str, model: str, answer: str):
+        if not normalize_question(question):
+            return
+        self._cache.set(self.key(question, resume_version, model), answer)
+    
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+# Singleton instance
+answer_cache = AnswerCache(
+    max_entries=settings.answer_cache_max_entries,
+    ttl=settings.answer_cache_ttl,
+    max_bytes=settings.answer_cache_max_bytes
+)
@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUTTLCache:
+    """
+    Bounded in-process cache with LRU eviction, a TTL and an approximate memory cap.
+    With sliding=True the TTL is an idle timeout refreshed on every hit; otherwise
+    entries expire a fixed time after they were stored.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        sliding: bool = True
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.sliding = sliding
+        
+        # key -> (value, expires_at, size)
+        self._entries: "OrderedDict[Hashable, tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None, counting the hit or miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        value, expires_at, size = entry
+        now = time.monotonic()
+        if now >= expires_at:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        
+        if self.sliding:
+            self._entries[key] = (value, now + self.ttl, size)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting least recently used entries past the caps"""
+        if key in self._entries:
+            self._remove(key)
+        size = self.sizeof(value)
+        self._entries[key] = (value, time.monotonic() + self.ttl, size)
+        self._bytes += size
+        
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove an entry without counting it as an eviction"""
+        if key not in self._entries:
+            return None
+        value = self._entries[key][0]
+        self._remove(key)
+        return value
+    
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+    
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() < entry[1]
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _remove(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
@@ -1,41 +1,31 @@
+import asyncio
+import json
+import time
 import httpx
 import uuid
-from typing import Optional
+from contextlib import aclosing, contextmanager
+from typing import AsyncIterator, Iterator, Optional
 from app.config import get_settings
 from app.services.resume_service import resume_service
-from app.database import get_supabase
+from app.services.answer_cache import answer_cache
+from app.services.conversation import conversation_summarizer, split_window
+from app.services.history_cache import history_cache
+from app.services.generation_policy import generation_policy
+from app.services.history_writer import history_writer
+from app.services.intent_router import intent_router
+from app.services.model_warmer import model_warmer
+from app.services.ollama_router import ollama_router
+from app.services.scheduler import AdmissionRejected, llm_scheduler
+from app.services.single_flight import Flight, single_flight
+from app.services.tokens import estimate_tokens
+from app.http_client import get_http_client
+from app.metrics import CHAT_STAGE_DURATION, CHAT_TURNS, record_ollama_stats
+from app.tracing import record_span, span
+from app.storage.factory import chat_history_store
 
 settings = get_settings()
 
-
-class ChatService:
-    """Service for handling AI chat with Ollama"""
-    
-    def __init__(self):
-        self.api_url = settings.ollama_url
-        self.model = settings.ollama_model
-        self.supabase = get_supabase()
-    
-    async def get_ai_response(self, user_message: str, session_id: Optional[str] = None) -> tuple[str, str]:
-        """
-        Get AI response based on user message and resume context
-        Returns: (response_text, session_id)
-        """
-        # Generate session ID if not provided
-        if not session_id:
-            session_id = str(uuid.uuid4())
-        
-        # Get resume context
-        resume_context = await resume_service.get_full_resume_context()
-        
-        # Get chat history for this session
-        chat_history = await self._get_chat_history(session_id)
-        
-        # Build messages for AI
-        messages = [
-            {
-                "role": "system",
-                "content": f"""You are an intelligent AI assistant representing Viharahamed M's portfolio. Your role is to help visitors learn about Viharahamed's background, skills, projects, and experience.
+SYSTEM_PROMPT_TEMPLATE = """You are an intelligent AI assistant representing Viharahamed M's portfolio. Your role is to help visitors learn about Viharahamed's background, skills, projects, and experience.
 
 PERSONALITY & TONE:
 - Be professional yet friendly and conversational
@@ -56,11 +46,141 @@ RESUME INFORMATION:
 {resume_context}
 
 Remember: You're here to showcase Viharahamed's expertise and help visitors connect with him. Be helpful, accurate, and engaging!"""
+
+OLLAMA_UNAVAILABLE_MESSAGE = "I'm sorry, I'm having trouble connecting to the AI service right now. Please make sure Ollama is running."
+GENERIC_ERROR_MESSAGE = "I'm sorry, something went wrong. Please try again."
+
+# Marks the end of the token buffer between the Ollama reader and the SSE writer
+_STREAM_END = object()
+
+
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    """Time one stage of a chat turn as a metric and a trace span"""
+    started = time.perf_counter()
+    with span(f"chat.{name}"):
+        try:
+            yield
+        finally:
+            CHAT_STAGE_DURATION.observe(time.perf_counter() - started, stage=name)
+
+
+def _observe_stage(name: str, started: float, ended: float):
+    """Record a stage measured elsewhere (perf_counter times)"""
+    CHAT_STAGE_DURATION.observe(ended - started, stage=name)
+    record_span(f"chat.{name}", started, ended)
+
+
+class ChatService:
+    """Service for handling AI chat with Ollama"""
+    
+    def __init__(self):
+        self.model = settings.ollama_model
+        # (resume version, formatted full-context prompt, context token estimate)
+        self._system_prompt: Optional[tuple[str, str, int]] = None
+        self.context_stats = {"turns": 0, "full_context_tokens": 0, "sent_context_tokens": 0}
+        # Model turns abandoned because the client disconnected, and the tokens they had produced
+        self.turn_stats = {"cancelled": 0, "partial_tokens": 0}
+    
+    async def _get_full_system_prompt(self) -> tuple[str, str, int]:
+        """(version, prompt, context tokens) for the full-context prompt, formatted once per resume version"""
+        version = resume_service.version
+        if self._system_prompt is None or self._system_prompt[0] != version:
+            resume_context = await resume_service.get_full_resume_context()
+            self._system_prompt = (
+                version,
+                SYSTEM_PROMPT_TEMPLATE.format(resume_context=resume_context),
+                estimate_tokens(resume_context)
+            )
+        return self._system_prompt
+    
+    async def _get_system_prompt(self, query: str) -> str:
+        """
+        System prompt for the current resume snapshot. In "full" mode it embeds the
+        whole resume and is formatted once per resume version; in "retrieved" mode it
+        embeds only the sections relevant to the query.
+        """
+        _, full_prompt, full_tokens = await self._get_full_system_prompt()
+        
+        self.context_stats["turns"] += 1
+        self.context_stats["full_context_tokens"] += full_tokens
+        if settings.resume_context_mode != "retrieved":
+            self.context_stats["sent_context_tokens"] += full_tokens
+            return full_prompt
+        
+        resume_context = await resume_service.get_retrieved_context(query, settings.retrieval_top_k)
+        self.context_stats["sent_context_tokens"] += estimate_tokens(resume_context)
+        return SYSTEM_PROMPT_TEMPLATE.format(resume_context=resume_context)
+    
+    def get_context_stats(self) -> dict:
+        """Estimated resume-context tokens sent vs. what full context would have cost"""
+        stats = dict(self.context_stats)
+        stats["mode"] = settings.resume_context_mode
+        stats["tokens_saved"] = stats["full_context_tokens"] - stats["sent_context_tokens"]
+        return stats
+    
+    def _answer_without_model(self, user_message: str, session_id: str, chat_history: list) -> Optional[tuple[str, str]]:
+        """
+        Answer without calling Ollama when possible: structured questions via the intent
+        router, then repeated first-turn questions via the answer cache.
+        Returns (answer, source) or None. The answer is persisted like a generated
+        reply so the session history stays complete.
+        """
+        answer, source = None, None
+        if settings.intent_router_enabled:
+            answer, source = intent_router.route(user_message, resume_service.resume_data), "intent"
+        if answer is None and not chat_history and settings.answer_cache_enabled:
+            answer, source = answer_cache.get(user_message, resume_service.version, self.model), "cache"
+        if not answer:
+            return None
+        self._save_message(session_id, "user", user_message)
+        self._save_message(session_id, "assistant", answer)
+        CHAT_TURNS.inc(source=source, outcome="ok")
+        return answer, source
+    
+    def _remember_answer(self, user_message: str, chat_history: list, answer: str, final_stats: dict):
+        """
+        Cache a generated first-turn answer for identical future questions.
+        Blank replies and replies cut off at num_predict are not worth repeating.
+        """
+        if chat_history or not settings.answer_cache_enabled:
+            return
+        if not answer.strip() or final_stats.get("done_reason") == "length":
+            return
+        answer_cache.put(user_message, resume_service.version, self.model, answer)
+    
+    async def _prepare_messages(self, user_message: str, session_id: str, chat_history: list) -> list:
+        """
+        Build the Ollama message list: system prompt, the running summary of older turns,
+        the most recent turns that fit the history token budget and the new user message
+        """
+        # Retrieval query: the new message plus the previous user turn, so that
+        # follow-ups like "tell me more about it" still find the right sections
+        previous = [msg["content"] for msg in chat_history if msg["role"] == "user"][-1:]
+        query = " ".join(previous + [user_message])
+        
+        # Build messages for AI
+        messages = [
+            {
+                "role": "system",
+                "content": await self._get_system_prompt(query)
             }
         ]
         
+        # Keep recent turns within budget; older ones are represented by the summary,
+        # which is refreshed in the background so the request never waits for it
+        older, recent = split_window(chat_history, settings.history_token_budget)
+        if older and settings.history_summary_enabled:
+            summary = conversation_summarizer.get(session_id)
+            if summary is not None:
+                messages.append({
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation: {summary.text}"
+                })
+            conversation_summarizer.schedule(session_id, older, self._complete)
+        
         # Add chat history
-        messages.extend(chat_history)
+        messages.extend(recent)
         
         # Add current user message
         messages.append({
@@ -68,73 +188,362 @@ Remember: You're here to showcase Viharahamed's expertise and help visitors conn
             "content": user_message
         })
         
-        # Save user message to database
-        await self._save_message(session_id, "user", user_message)
+        return messages
+    
+    def _ollama_payload(self, messages: list, stream: bool, options: Optional[dict] = None) -> dict:
+        """Request body for Ollama's /api/chat"""
+        return {
+            "model": self.model,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": model_warmer.keep_alive,
+            "options": options or generation_policy.options(None)
+        }
+    
+    async def _call_ollama(self, messages: list, options: Optional[dict] = None, chat_turn: bool = True, session_id: Optional[str] = None) -> dict:
+        """Non-streaming Ollama chat call over the shared pooled client, routed across backends"""
+        async def send(api_url: str) -> dict:
+            response = await get_http_client().post(
+                f"{api_url}/api/chat",
+                headers={
+                    "Content-Type": "application/json"
+                },
+                json=self._ollama_payload(messages, stream=False, options=options)
+            )
+            response.raise_for_status()
+            return response.json()
+        
+        data = await ollama_router.call(session_id, send)
+        record_ollama_stats(data)
+        if chat_turn:
+            model_warmer.record_turn(data)
+        else:
+            model_warmer.mark_used()
+        return data
+    
+    async def _complete(self, messages: list) -> str:
+        """Short, low-temperature completion for background work such as summaries"""
+        async with llm_scheduler.slot():
+            data = await self._call_ollama(messages, options={
+                "temperature": 0.2,
+                "num_predict": settings.history_summary_max_tokens
+            }, chat_turn=False)
+        return data["message"]["content"]
+    
+    async def warm_up(self) -> str:
+        """Load the model and prime the static system prompt if it isn't warm already"""
+        # Retrieved-context prompts differ per question, so only the full prompt is worth priming
+        system_prompt = None
+        if settings.resume_context_mode != "retrieved":
+            _, system_prompt, _ = await self._get_full_system_prompt()
+        return model_warmer.ensure_warm(ollama_router.healthy_urls(), system_prompt)
+    
+    async def get_ai_response(self, user_message: str, session_id: Optional[str] = None) -> tuple[str, str]:
+        """
+        Get AI response based on user message and resume context
+        Returns: (response_text, session_id)
+        """
+        # Generate session ID if not provided
+        if not session_id:
+            session_id = self._new_session()
+        
+        # Get chat history for this session
+        with _stage("history"):
+            chat_history = await self._get_chat_history(session_id)
+        
+        instant = self._answer_without_model(user_message, session_id, chat_history)
+        if instant is not None:
+            return instant[0], session_id
         
+        with _stage("context"):
+            messages = await self._prepare_messages(user_message, session_id, chat_history)
+        question_class = generation_policy.classify(user_message)
+        flight = self._join_flight(user_message, session_id, chat_history, messages, question_class)
+        
+        # Waits for an LLM slot; AdmissionRejected propagates so the route can answer 503
         try:
-            # Call Ollama API
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    f"{self.api_url}/api/chat",
-                    headers={
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.7,
-                            "num_predict": 500
-                        }
-                    }
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                ai_response = data["message"]["content"]
-                
-                # Save AI response to database
-                await self._save_message(session_id, "assistant", ai_response)
-                
-                return ai_response, session_id
-                
+            async with (flight.admission() if flight else llm_scheduler.slot()) as admission:
+                admitted_at = time.perf_counter()
+                _observe_stage("queue_wait", admitted_at - admission["wait_seconds"], admitted_at)
+                # Save user message to database
+                self._save_message(session_id, "user", user_message)
+                return await self._generate_reply(user_message, session_id, chat_history, messages, flight, question_class)
+        except AdmissionRejected:
+            CHAT_TURNS.inc(source="model", outcome="rejected")
+            raise
+        except asyncio.CancelledError:
+            self.turn_stats["cancelled"] += 1
+            CHAT_TURNS.inc(source="model", outcome="cancelled")
+            raise
+    
+    async def _generate_reply(self, user_message: str, session_id: str, chat_history: list, messages: list, flight: Optional[Flight], question_class: str) -> tuple[str, str]:
+        """
+        Complete reply for an admitted turn, generated here or shared with a flight.
+        Tokens are streamed from Ollama even though the caller waits for the whole text,
+        so cancelling the turn closes the upstream request and stops generation.
+        """
+        final_stats: dict = flight.stats if flight else {}
+        tokens = flight.follow() if flight else self._ollama_tokens(messages, final_stats, session_id, question_class)
+        parts: list[str] = []
+        generation_started = time.perf_counter()
+        try:
+            async with aclosing(tokens):
+                async for token in tokens:
+                    if not parts:
+                        _observe_stage("ttft", generation_started, time.perf_counter())
+                    parts.append(token)
+            _observe_stage("generation", generation_started, time.perf_counter())
+            ai_response = "".join(parts)
+            
+            # Save AI response to database
+            self._save_message(session_id, "assistant", ai_response)
+            self._remember_answer(user_message, chat_history, ai_response, final_stats)
+            
+            CHAT_TURNS.inc(source="model", outcome="ok")
+            return ai_response, session_id
+            
+        except asyncio.CancelledError:
+            self._save_partial_reply(session_id, parts)
+            raise
         except httpx.HTTPError as e:
-            error_msg = f"HTTP Error calling Ollama: {str(e)}\nResponse text: {e.response.text if hasattr(e, 'response') and e.response else 'No response'}"
-            print(error_msg)
-            return "I'm sorry, I'm having trouble connecting to the AI service right now. Please make sure Ollama is running.", session_id
+            print(f"HTTP Error calling Ollama: {str(e)}")
+            CHAT_TURNS.inc(source="model", outcome="error")
+            return OLLAMA_UNAVAILABLE_MESSAGE, session_id
         except Exception as e:
             print(f"Error getting AI response: {e}")
-            return "I'm sorry, something went wrong. Please try again.", session_id
+            CHAT_TURNS.inc(source="model", outcome="error")
+            return GENERIC_ERROR_MESSAGE, session_id
+    
+    def _save_partial_reply(self, session_id: str, parts: list[str]):
+        """The client went away mid-reply: keep what was generated only if configured to"""
+        self.turn_stats["partial_tokens"] += len(parts)
+        if parts and settings.chat_persist_partial_replies:
+            self._save_message(session_id, "assistant", "".join(parts))
+    
+    async def stream_ai_response(self, user_message: str, session_id: Optional[str] = None) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Stream the AI response token by token as Ollama generates it.
+        Yields (event, data) pairs: ("start", {...}) once a model turn is admitted, any number of
+        ("token", {"content": ...}), then exactly one ("done", {...}) carrying the session_id and
+        timing stats, or ("error", {...}) on failure. Raises AdmissionRejected before the first
+        event when the LLM queue is saturated.
+        The full reply is persisted once, after the stream completes.
+        """
+        if not session_id:
+            session_id = self._new_session()
+        
+        started = time.perf_counter()
+        with _stage("history"):
+            chat_history = await self._get_chat_history(session_id)
+        
+        instant = self._answer_without_model(user_message, session_id, chat_history)
+        if instant is not None:
+            answer, source = instant
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            yield "token", {"content": answer}
+            yield "done", {
+                "session_id": session_id,
+                "time_to_first_token_ms": elapsed_ms,
+                "total_time_ms": elapsed_ms,
+                "source": source
+            }
+            return
+        
+        with _stage("context"):
+            messages = await self._prepare_messages(user_message, session_id, chat_history)
+        question_class = generation_policy.classify(user_message)
+        flight = self._join_flight(user_message, session_id, chat_history, messages, question_class)
+        if flight is not None:
+            admit, final_stats, tokens = flight.admission(), flight.stats, flight.follow()
+        else:
+            final_stats = {}
+            admit, tokens = llm_scheduler.slot(), self._ollama_tokens(messages, final_stats, session_id, question_class)
+        
+        # Admission happens before the first event, so a rejection surfaces as an
+        # AdmissionRejected from the first __anext__() while the route can still send a 503
+        try:
+            async with admit as admission:
+                admitted_at = time.perf_counter()
+                _observe_stage("queue_wait", admitted_at - admission["wait_seconds"], admitted_at)
+                self._save_message(session_id, "user", user_message)
+                yield "start", {
+                    "session_id": session_id,
+                    "queue_wait_ms": round(admission["wait_seconds"] * 1000, 1)
+                }
+                reply = self._stream_reply(user_message, session_id, chat_history, tokens, final_stats, started, question_class)
+                async with aclosing(reply) as events:
+                    async for event in events:
+                        yield event
+        except AdmissionRejected:
+            CHAT_TURNS.inc(source="model", outcome="rejected")
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client disconnected: the route cancelled or closed this generator
+            self.turn_stats["cancelled"] += 1
+            CHAT_TURNS.inc(source="model", outcome="cancelled")
+            raise
     
-    async def _get_chat_history(self, session_id: str, limit: int = 10) -> list:
-        """Get recent chat history for context"""
+    async def _stream_reply(self, user_message: str, session_id: str, chat_history: list, tokens: AsyncIterator[str], final_stats: dict, started: float, question_class: str) -> AsyncIterator[tuple[str, dict]]:
+        """Relay the tokens of an admitted turn as events, then persist the full reply"""
+        parts: list[str] = []
+        first_token_at: Optional[float] = None
+        ai_response: Optional[str] = None
+        generation_started = time.perf_counter()
         try:
-            response = self.supabase.table('chat_history')\
-                .select('role, content')\
-                .eq('session_id', session_id)\
-                .order('created_at', desc=False)\
-                .limit(limit)\
-                .execute()
+            async with aclosing(tokens):
+                async for item in tokens:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        _observe_stage("ttft", generation_started, first_token_at)
+                    parts.append(item)
+                    yield "token", {"content": item}
             
-            if response.data:
-                return [{"role": msg["role"], "content": msg["content"]} for msg in response.data]
-            return []
+            _observe_stage("generation", generation_started, time.perf_counter())
+            ai_response = "".join(parts)
+            self._save_message(session_id, "assistant", ai_response)
+            self._remember_answer(user_message, chat_history, ai_response, final_stats)
+            
+            finished = time.perf_counter()
+            yield "done", {
+                "session_id": session_id,
+                "time_to_first_token_ms": round((first_token_at - started) * 1000, 1) if first_token_at else None,
+                "total_time_ms": round((finished - started) * 1000, 1),
+                "eval_count": final_stats.get("eval_count"),
+                "prompt_eval_count": final_stats.get("prompt_eval_count"),
+                "question_class": question_class,
+                "source": "model"
+            }
+            CHAT_TURNS.inc(source="model", outcome="ok")
+        except (asyncio.CancelledError, GeneratorExit):
+            if ai_response is None:
+                self._save_partial_reply(session_id, parts)
+            raise
+        except httpx.HTTPError as e:
+            print(f"HTTP Error streaming from Ollama: {e}")
+            CHAT_TURNS.inc(source="model", outcome="error")
+            yield "error", {"session_id": session_id, "message": OLLAMA_UNAVAILABLE_MESSAGE}
         except Exception as e:
-            print(f"Error fetching chat history: {e}")
-            return []
+            print(f"Error streaming AI response: {e}")
+            CHAT_TURNS.inc(source="model", outcome="error")
+            yield "error", {"session_id": session_id, "message": GENERIC_ERROR_MESSAGE}
     
-    async def _save_message(self, session_id: str, role: str, content: str):
-        """Save message to chat history"""
+    def _join_flight(self, user_message: str, session_id: str, chat_history: list, messages: list, question_class: str) -> Optional[Flight]:
+        """
+        Share one generation between concurrent identical first-turn questions.
+        Returns None when the turn can't be shared (it has history, or coalescing is off).
+        """
+        if chat_history or not settings.chat_single_flight_enabled:
+            return None
+        key = answer_cache.key(user_message, resume_service.version, self.model)
+        if not key[0]:
+            return None
+        return single_flight.join(key, lambda flight: self._run_flight(flight, messages, question_class), session_id)
+    
+    async def _run_flight(self, flight: Flight, messages: list, question_class: str):
+        """Generate a shared reply once, publishing tokens to every subscriber"""
+        async with llm_scheduler.slot() as admission:
+            flight.admit(admission["wait_seconds"])
+            # Route by the first subscriber's session and pin every subscriber's session to the backend
+            tokens = self._ollama_tokens(
+                messages, flight.stats, flight.session_ids[0] if flight.session_ids else None, question_class,
+                affinity_sessions=flight.session_ids
+            )
+            async with aclosing(tokens) as tokens:
+                async for token in tokens:
+                    flight.publish(token)
+    
+    async def _ollama_tokens(self, messages: list, final_stats: dict, session_id: Optional[str] = None, question_class: Optional[str] = None, affinity_sessions: Optional[list] = None) -> AsyncIterator[str]:
+        """
+        Yield streamed Ollama tokens; final_stats receives the closing chunk.
+        affinity_sessions (default: just session_id) are pinned to the backend that served the reply.
+        """
+        # Bounded buffer: when the consumer reads slowly the reader blocks on put(),
+        # stops draining the Ollama socket and lets TCP push back on generation.
+        buffer: asyncio.Queue = asyncio.Queue(maxsize=settings.chat_stream_buffer_size)
+        reader = asyncio.create_task(self._read_ollama_stream(messages, buffer, final_stats, session_id, question_class, affinity_sessions))
         try:
-            self.supabase.table('chat_history').insert({
-                "session_id": session_id,
-                "role": role,
-                "content": content
-            }).execute()
+            while True:
+                item = await buffer.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not reader.done():
+                reader.cancel()
+    
+    async def _read_ollama_stream(self, messages: list, buffer: asyncio.Queue, final_stats: dict, session_id: Optional[str] = None, question_class: Optional[str] = None, affinity_sessions: Optional[list] = None):
+        """Forward streamed Ollama chunks into the bounded buffer, ending with _STREAM_END"""
+        tried: set = set()
+        while True:
+            backend = ollama_router.pick(session_id, exclude=frozenset(tried))
+            tried.add(backend.url)
+            streamed = False
+            try:
+                async with ollama_router.track(backend):
+                    async with get_http_client().stream(
+                        "POST",
+                        f"{backend.url}/api/chat",
+                        json=self._ollama_payload(messages, stream=True, options=generation_policy.options(question_class))
+                    ) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            if chunk.get("error"):
+                                raise RuntimeError(chunk["error"])
+                            content = chunk.get("message", {}).get("content", "")
+                            if content:
+                                streamed = True
+                                await buffer.put(content)
+                            if chunk.get("done"):
+                                final_stats.update(chunk)
+                                model_warmer.record_turn(chunk)
+                                generation_policy.record(question_class, chunk)
+                                record_ollama_stats(chunk)
+                                break
+            except Exception as e:
+                # Fail over only while nothing has reached the client yet
+                if not streamed and ollama_router.should_failover(e, tried):
+                    continue
+                await buffer.put(e)
+                return
+            for bound_session in (affinity_sessions if affinity_sessions is not None else [session_id]):
+                ollama_router.bind(bound_session, backend)
+            break
+        await buffer.put(_STREAM_END)
+    
+    def _new_session(self) -> str:
+        """Start a session; its (empty) history is cached so the first turn skips the store"""
+        session_id = str(uuid.uuid4())
+        history_cache.set(session_id, [])
+        return session_id
+    
+    async def _get_chat_history(self, session_id: str) -> list:
+        """Get recent chat history for context, reading through to the store only on a cache miss"""
+        cached = history_cache.get(session_id)
+        if cached is not None:
+            return cached
+        
+        try:
+            rows = await chat_history_store.fetch_recent(session_id, settings.history_cache_max_messages)
         except Exception as e:
-            print(f"Error saving message: {e}")
+            print(f"Error fetching chat history: {e}")
+            return []
+        
+        # Include messages still waiting in the write-behind queue
+        rows = rows + history_writer.pending_for(session_id)
+        messages = [{"role": msg["role"], "content": msg["content"]} for msg in rows]
+        history_cache.set(session_id, messages)
+        return messages
+    
+    def _save_message(self, session_id: str, role: str, content: str):
+        """Queue message for the write-behind chat history writer and update the session cache"""
+        with _stage("persistence"):
+            history_writer.enqueue(session_id, role, content)
+            history_cache.append(session_id, role, content)
 
 
 # Singleton instance
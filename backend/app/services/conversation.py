@@ -0,0 +1,139 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.services.cache import LRUTTLCache
+from app.services.tokens import estimate_tokens
+
+settings = get_settings()
+
+# Role markers and separators Ollama's chat template adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_INSTRUCTIONS = (
+    "Summarize the conversation below between a portfolio visitor and the assistant in a few "
+    "short sentences. Keep the visitor's questions, names, projects and facts that were "
+    "discussed, and anything the visitor said about themselves. Reply with the summary only."
+)
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def split_window(messages: List[Dict[str, str]], budget: int) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Split a session's history into (older, recent): recent is the longest tail of
+    messages that fits the token budget and starts with a user turn, older is
+    everything before it.
+    """
+    used = 0
+    start = len(messages)
+    while start > 0:
+        cost = message_tokens(messages[start - 1])
+        if used + cost > budget:
+            break
+        used += cost
+        start -= 1
+    # Don't open the window mid-turn with an assistant reply to a question that was cut
+    while start < len(messages) and messages[start]["role"] == "assistant":
+        start += 1
+    return messages[:start], messages[start:]
+
+
+def _fingerprint(message: Dict[str, str]) -> Tuple[str, str]:
+    return (message["role"], message["content"])
+
+
+@dataclass(frozen=True)
+class Summary:
+    """Running summary of a session's older messages"""
+    text: str
+    # Fingerprint and count of the last message folded into the summary
+    last_message: Tuple[str, str]
+    covered: int
+
+
+# Produces a completion for the given chat messages (the summarizer's only model dependency)
+CompleteFn = Callable[[List[Dict[str, str]]], Awaitable[str]]
+
+
+class ConversationSummarizer:
+    """Folds messages that fall out of the token window into a per-session running summary"""
+    
+    def __init__(self, max_sessions: int, ttl: float):
+        self._summaries = LRUTTLCache(max_entries=max_sessions, ttl=ttl)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.stats = {"summaries": 0, "failures": 0, "messages_folded": 0}
+    
+    def get(self, session_id: str) -> Optional[Summary]:
+        return self._summaries.get(session_id)
+    
+    def _uncovered(self, summary: Optional[Summary], older: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Messages in `older` that the summary doesn't cover yet"""
+        if summary is None:
+            return older
+        # Trimming the cached history only moves messages to lower positions, so the
+        # last summarized message sits at index covered-1 or below
+        for i in range(min(summary.covered, len(older)) - 1, -1, -1):
+            if _fingerprint(older[i]) == summary.last_message:
+                return older[i + 1:]
+        # The last summarized message has been trimmed from the cached history,
+        # so everything still listed is newer than the summary
+        return older
+    
+    def schedule(self, session_id: str, older: List[Dict[str, str]], complete: CompleteFn):
+        """Refresh the session's summary in the background if messages were left out of it"""
+        if not older or session_id in self._tasks:
+            return
+        summary = self.get(session_id)
+        pending = self._uncovered(summary, older)
+        if not pending:
+            return
+        task = asyncio.create_task(self._summarize(session_id, summary, pending, complete))
+        self._tasks[session_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(session_id, None))
+    
+    async def _summarize(
+        self,
+        session_id: str,
+        summary: Optional[Summary],
+        pending: List[Dict[str, str]],
+        complete: CompleteFn
+    ):
+        transcript = "\n".join(f"{msg['role'].title()}: {msg['content']}" for msg in pending)
+        if summary is not None:
+            transcript = f"Summary so far: {summary.text}\n\n{transcript}"
+        try:
+            text = (await complete([
+                {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                {"role": "user", "content": transcript}
+            ])).strip()
+        except Exception as e:
+            self.stats["failures"] += 1
+            print(f"Error summarizing conversation {session_id}: {e}")
+            return
+        if not text:
+            return
+        
+        covered = (summary.covered if summary else 0) + len(pending)
+        self._summaries.set(session_id, Summary(text=text, last_message=_fingerprint(pending[-1]), covered=covered))
+        self.stats["summaries"] += 1
+        self.stats["messages_folded"] += len(pending)
+    
+    async def stop(self):
+        """Cancel in-flight summaries (called on app shutdown)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "in_flight": len(self._tasks), "sessions": len(self._summaries)}
+
+
+# Singleton instance
+conversation_summarizer = ConversationSummarizer(
+    max_sessions=settings.history_cache_max_sessions,
+    ttl=settings.history_cache_idle_ttl
+)
@@ -0,0 +1,116 @@
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional
+from app.config import get_settings
+from app.services.answer_cache import normalize_question
+
+settings = get_settings()
+
+# Question classes, from cheapest to most expensive to answer
+SHORT = "short"
+LIST = "list"
+OPEN = "open"
+
+# Checked on the normalized question, in this order
+_OPEN_RE = re.compile(
+    r"\b(?:explain|describe|elaborate|walk me through|in detail|compare|why|how (?:does|did|do|would|could)|"
+    r"what do you think|tell me (?:more|everything|about)|introduce|approach|challenges?|architecture)\b"
+)
+_LIST_RE = re.compile(
+    r"\b(?:list|all|overview|summar(?:y|ize|ise)|what are|which|projects|skills|technologies|tools|"
+    r"languages|certifications|experiences|strengths|achievements|domains)\b"
+)
+_SHORT_START_RE = re.compile(
+    r"^(?:what|who|where|when|which|is|are|does|do|did|can|has|have|how (?:many|much|long|old))\b"
+)
+
+# Questions up to this many words that aren't lists or open-ended count as short
+MAX_SHORT_WORDS = 12
+
+# Per-turn eval_counts kept per class for /api/stats
+RECENT_TURNS = 20
+
+
+def classify_question(text: str) -> str:
+    """Lightweight guess at how long an answer the question needs"""
+    question = normalize_question(text)
+    if _OPEN_RE.search(question):
+        return OPEN
+    if _LIST_RE.search(question):
+        return LIST
+    words = len(question.split())
+    if words <= MAX_SHORT_WORDS and (_SHORT_START_RE.match(question) or words <= 4):
+        return SHORT
+    return OPEN
+
+
+class GenerationPolicy:
+    """Picks Ollama generation options per question class and tracks how many tokens each class uses"""
+    
+    def __init__(self, profiles: Dict[str, Dict[str, Any]], adaptive: bool):
+        self.profiles = profiles
+        self.adaptive = adaptive
+        self.stats = {
+            name: {"turns": 0, "eval_tokens": 0, "max_eval_tokens": 0, "hit_limit": 0}
+            for name in profiles
+        }
+        # Latest turns per class: {"eval_count", "prompt_eval_count", "hit_limit"}
+        self.recent = {name: deque(maxlen=RECENT_TURNS) for name in profiles}
+    
+    def classify(self, text: str) -> str:
+        return classify_question(text) if self.adaptive else OPEN
+    
+    def options(self, question_class: Optional[str]) -> Dict[str, Any]:
+        """Ollama options for a chat turn of the given class"""
+        profile = self.profiles[question_class or OPEN]
+        options = {
+            "temperature": profile["temperature"],
+            "num_predict": profile["num_predict"]
+        }
+        if profile["stop"]:
+            options["stop"] = list(profile["stop"])
+        return options
+    
+    def record(self, question_class: Optional[str], ollama_stats: Dict[str, Any]):
+        """Count a finished turn's eval_count so the per-class budgets can be tuned (see /api/stats)"""
+        question_class = question_class or OPEN
+        eval_count = ollama_stats.get("eval_count") or 0
+        num_predict = self.profiles[question_class]["num_predict"]
+        stats = self.stats[question_class]
+        stats["turns"] += 1
+        stats["eval_tokens"] += eval_count
+        stats["max_eval_tokens"] = max(stats["max_eval_tokens"], eval_count)
+        hit_limit = ollama_stats.get("done_reason") == "length" or eval_count >= num_predict
+        if hit_limit:
+            stats["hit_limit"] += 1
+        self.recent[question_class].append({
+            "eval_count": eval_count,
+            "prompt_eval_count": ollama_stats.get("prompt_eval_count"),
+            "hit_limit": hit_limit
+        })
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                **stats,
+                "avg_eval_tokens": round(stats["eval_tokens"] / stats["turns"], 1) if stats["turns"] else 0.0,
+                "num_predict": self.profiles[name]["num_predict"],
+                "recent_turns": list(self.recent[name])
+            }
+            for name, stats in self.stats.items()
+        }
+
+
+def _profile(num_predict: int, temperature: float, stop: List[str]) -> Dict[str, Any]:
+    return {"num_predict": num_predict, "temperature": temperature, "stop": stop}
+
+
+# Singleton instance
+generation_policy = GenerationPolicy(
+    profiles={
+        SHORT: _profile(settings.generation_short_num_predict, settings.generation_short_temperature, settings.generation_short_stop),
+        LIST: _profile(settings.generation_list_num_predict, settings.generation_list_temperature, settings.generation_list_stop),
+        OPEN: _profile(settings.generation_open_num_predict, settings.generation_open_temperature, settings.generation_open_stop),
+    },
+    adaptive=settings.generation_adaptive
+)
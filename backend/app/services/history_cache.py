@@ -0,0 +1,55 @@
+from typing import Dict, List, Optional
+from app.config import get_settings
+from app.services.cache import LRUTTLCache
+
+settings = get_settings()
+
+# Rough per-message overhead (dict, strings, list slot) on top of the content
+_MESSAGE_OVERHEAD_BYTES = 200
+
+
+def _history_size(messages: List[Dict[str, str]]) -> int:
+    """Approximate memory held by a cached session history"""
+    return sum(len(msg["content"]) + _MESSAGE_OVERHEAD_BYTES for msg in messages)
+
+
+class SessionHistoryCache:
+    """In-process cache of recent chat messages per session, kept current on write"""
+    
+    def __init__(self, max_sessions: int, idle_ttl: float, max_bytes: int, max_messages: int):
+        self.max_messages = max_messages
+        self._cache = LRUTTLCache(
+            max_entries=max_sessions,
+            ttl=idle_ttl,
+            max_bytes=max_bytes,
+            sizeof=_history_size
+        )
+    
+    def get(self, session_id: str) -> Optional[List[Dict[str, str]]]:
+        """Cached messages for a session, or None on a miss"""
+        messages = self._cache.get(session_id)
+        return list(messages) if messages is not None else None
+    
+    def set(self, session_id: str, messages: List[Dict[str, str]]):
+        """Cache a session's history (e.g. after reading it from the store)"""
+        self._cache.set(session_id, list(messages[-self.max_messages:]))
+    
+    def append(self, session_id: str, role: str, content: str):
+        """Add a newly written message if the session is cached"""
+        if session_id not in self._cache:
+            return
+        messages = self._cache.pop(session_id)
+        messages.append({"role": role, "content": content})
+        self.set(session_id, messages)
+    
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+# Singleton instance
+history_cache = SessionHistoryCache(
+    max_sessions=settings.history_cache_max_sessions,
+    idle_ttl=settings.history_cache_idle_ttl,
+    max_bytes=settings.history_cache_max_bytes,
+    max_messages=settings.history_cache_max_messages
+)
@@ -0,0 +1,182 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+from app.config import get_settings
+from app.metrics import HISTORY_FLUSH_DURATION, registry
+from app.storage.factory import chat_history_store
+
+settings = get_settings()
+
+
+class HistoryWriter:
+    """Write-behind queue that batches chat_history inserts off the request path"""
+    
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+        initial_backoff: float,
+        max_backoff: float,
+        shutdown_attempts: int
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.shutdown_attempts = shutdown_attempts
+        
+        self._pending: Deque[Dict[str, Any]] = deque()
+        # Batch being inserted right now; still reported by pending_for until the insert succeeds
+        self._in_flight: List[Dict[str, Any]] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._failures = 0
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "failed_flushes": 0
+        }
+    
+    def enqueue(self, session_id: str, role: str, content: str):
+        """Queue a message for the next bulk insert; never blocks the caller"""
+        if len(self._pending) >= self.max_pending:
+            # Bounded memory: shed the oldest row rather than grow without limit
+            self._pending.popleft()
+            self.stats["dropped"] += 1
+        
+        # Stamp the time here: rows flushed in one batch would otherwise share
+        # the database default NOW() and lose their order within a session
+        self._pending.append({
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        })
+        self.stats["enqueued"] += 1
+        
+        # While the store is failing, let the backoff run its course
+        if len(self._pending) >= self.batch_size and not self._failures and self._wake is not None:
+            self._wake.set()
+    
+    def pending_for(self, session_id: str) -> List[Dict[str, Any]]:
+        """Messages for a session that are queued or being inserted, oldest first"""
+        return [
+            row for row in itertools.chain(self._in_flight, self._pending)
+            if row["session_id"] == session_id
+        ]
+    
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+    
+    async def start(self):
+        """Start the background flush loop (called on app startup)"""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the flush loop and write out everything still queued (called on app shutdown)"""
+        self._stopping = True
+        if self._task is not None:
+            self._wake.set()
+            await self._task
+            self._task = None
+        
+        attempts = 0
+        while self._pending and attempts < self.shutdown_attempts:
+            if await self._flush_once():
+                attempts = 0
+            else:
+                attempts += 1
+                await asyncio.sleep(self._backoff(attempts))
+        
+        if self._pending:
+            print(f"Error flushing chat history on shutdown: {len(self._pending)} messages lost")
+    
+    async def _run(self):
+        """Flush when a full batch is queued or every flush_interval seconds, backing off on failure"""
+        while True:
+            if self._failures:
+                await self._sleep(self._backoff(self._failures))
+            elif len(self._pending) < self.batch_size:
+                await self._sleep(self.flush_interval)
+            
+            if self._stopping:
+                return
+            
+            while self._pending:
+                if await self._flush_once():
+                    self._failures = 0
+                else:
+                    self._failures += 1
+                    break
+    
+    async def _sleep(self, delay: float):
+        """Sleep until the delay passes or the loop is woken early"""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+    
+    async def _flush_once(self) -> bool:
+        """Insert up to batch_size queued rows; on failure put them back at the front"""
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        if not batch:
+            return True
+        self._in_flight = batch
+        started = time.perf_counter()
+        try:
+            await chat_history_store.append_many(batch)
+        except Exception as e:
+            self._in_flight = []
+            HISTORY_FLUSH_DURATION.observe(time.perf_counter() - started, outcome="error")
+            print(f"Error flushing chat history ({len(batch)} messages): {e}")
+            self.stats["failed_flushes"] += 1
+            # Re-queue in order; rows that no longer fit are the oldest and get dropped
+            room = self.max_pending - len(self._pending)
+            if room < len(batch):
+                self.stats["dropped"] += len(batch) - max(room, 0)
+                batch = batch[len(batch) - max(room, 0):]
+            self._pending.extendleft(reversed(batch))
+            return False
+        self._in_flight = []
+        HISTORY_FLUSH_DURATION.observe(time.perf_counter() - started, outcome="ok")
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        return True
+    
+    def _backoff(self, failures: int) -> float:
+        """Exponential backoff capped at max_backoff"""
+        return min(self.initial_backoff * (2 ** (failures - 1)), self.max_backoff)
+
+
+# Singleton instance
+history_writer = HistoryWriter(
+    batch_size=settings.history_write_batch_size,
+    flush_interval=settings.history_flush_interval,
+    max_pending=settings.history_max_pending,
+    initial_backoff=settings.history_retry_initial_backoff,
+    max_backoff=settings.history_retry_max_backoff,
+    shutdown_attempts=settings.history_shutdown_flush_attempts
+)
+
+registry.callback(
+    "history_writer_pending", "Chat history rows waiting to be written",
+    lambda: {(): history_writer.pending}
+)
+registry.callback(
+    "history_writer_rows", "Chat history rows by fate",
+    lambda: {(fate,): history_writer.stats[fate] for fate in ("written", "dropped")},
+    labelnames=("fate",), type="counter"
+)
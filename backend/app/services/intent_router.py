@@ -0,0 +1,207 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Pattern
+from app.services.answer_cache import normalize_question
+
+# Building blocks for the (normalized, punctuation-free) question patterns
+_WHO = r"(?:you|he|viharahamed)"
+_WHOSE = r"(?:your|his|viharahamed s)"
+_WHAT_IS = r"(?:what s|whats|what is|what are|what were|tell me|give me|show me|share|list)"
+_PLEASE = r"(?: please)?"
+
+# Messages longer than this go to the model: they usually ask for more than a lookup
+MAX_ROUTED_WORDS = 14
+
+
+def _patterns(*regexes: str) -> List[Pattern]:
+    return [re.compile(rf"^(?:hi |hey |hello )?(?:{regex}){_PLEASE}$") for regex in regexes]
+
+
+# Intent names match the faq_responses / conversation_context keys they stand in for
+_INTENT_PATTERNS: Dict[str, List[Pattern]] = {
+    "contact_methods": _patterns(
+        rf"(?:how|where) (?:can|do|could|should) i (?:contact|reach|email|mail|call|hire|connect with|get in touch with)(?: {_WHO})?",
+        rf"(?:can i|i want to|i d like to) (?:contact|reach|email|hire|connect with|get in touch with) {_WHO}",
+        rf"(?:{_WHAT_IS} )?(?:{_WHOSE} )?(?:email|e mail|email address|mail id|phone|phone number|mobile number|contact|contact info|contact information|contact details|linkedin|github)(?: id| profile| address)?",
+    ),
+    "education_background": _patterns(
+        rf"(?:{_WHAT_IS} )?(?:{_WHOSE} )?(?:cgpa|gpa|grades|education|educational background|education background|degree|qualification|qualifications)",
+        rf"(?:where|what) (?:do|did|does) {_WHO} stud(?:y|ied|ies)",
+        rf"(?:which|what) college (?:do|did|does) {_WHO} (?:go to|attend|study at)",
+        rf"tell me about {_WHOSE} education",
+    ),
+    "main_projects": _patterns(
+        rf"(?:{_WHAT_IS} )?(?:all |some of )?(?:{_WHOSE} )?(?:main |major |key |top )?projects",
+        rf"(?:what|which) projects (?:have|has|did) {_WHO} (?:built|build|done|do|made|make|worked on|work on)",
+        rf"tell me about {_WHOSE} projects",
+    ),
+    "certifications": _patterns(
+        rf"(?:{_WHAT_IS} )?(?:{_WHOSE} )?(?:certifications|certificates|certification)",
+        rf"(?:what|which) (?:certifications|certificates) (?:do|does|have|has|did) {_WHO}(?: have| hold| earned| earn| completed| complete| got| get)?",
+        rf"(?:do|does) {_WHO} have (?:any )?(?:certifications|certificates)",
+    ),
+    "technical_expertise": _patterns(
+        rf"(?:{_WHAT_IS} )?(?:{_WHOSE} )?(?:technical )?(?:skills|skill set|skillset|tech stack|programming languages|languages|databases|web technologies)",
+        rf"(?:what|which) (?:skills|technologies|programming languages|languages|databases|web technologies) (?:do|does) {_WHO} (?:know|have|use|work with)",
+    ),
+    "work_experience": _patterns(
+        rf"(?:{_WHAT_IS} )?(?:{_WHOSE} )?(?:work experience|experience|internship|internship experience|work history)",
+        rf"where (?:did|has|have) {_WHO} (?:intern|interned|work|worked)",
+        rf"(?:do|does|did) {_WHO} have (?:any )?(?:work experience|experience|internship|internship experience)",
+        rf"tell me about {_WHOSE} (?:internship|work experience|experience)",
+    ),
+}
+
+# Skill categories a question can narrow technical_expertise down to
+_SKILL_CATEGORY_TERMS = {
+    "programming_languages": ("programming languages", "languages"),
+    "web_technologies": ("web technologies",),
+    "databases": ("databases",),
+}
+
+
+def _join(items: List[str]) -> str:
+    if len(items) <= 1:
+        return "".join(items)
+    return ", ".join(items[:-1]) + " and " + items[-1]
+
+
+def _answer_contact(data: Dict[str, Any], question: str) -> Optional[str]:
+    personal = data.get('personal_info', {})
+    lines = [
+        f"{label}: {personal[key]}"
+        for key, label in (('email', 'Email'), ('phone', 'Phone'), ('linkedin', 'LinkedIn'), ('github', 'GitHub'))
+        if personal.get(key)
+    ]
+    if not lines:
+        return None
+    name = personal.get('name', 'Viharahamed')
+    return f"You can reach {name} through any of these:\n" + "\n".join(f"- {line}" for line in lines)
+
+
+def _answer_education(data: Dict[str, Any], question: str) -> Optional[str]:
+    current = data.get('education', {}).get('current', {})
+    if not current:
+        return None
+    answer = f"Viharahamed is pursuing a {current.get('degree', 'degree')} at {current.get('institution', 'college')}"
+    if current.get('location'):
+        answer += f", {current['location']}"
+    answer += "."
+    if current.get('cgpa'):
+        upto = f" (up to {current['upto_semester']})" if current.get('upto_semester') else ""
+        answer += f" His current CGPA is {current['cgpa']}{upto}"
+        answer += f", with graduation expected in {current['expected_graduation']}." if current.get('expected_graduation') else "."
+    return answer
+
+
+def _answer_projects(data: Dict[str, Any], question: str) -> Optional[str]:
+    projects = data.get('projects', [])
+    if not projects:
+        return None
+    lines = []
+    for proj in projects:
+        line = f"- {proj.get('name', 'Untitled')}"
+        if proj.get('type'):
+            line += f" ({proj['type']})"
+        if proj.get('technologies'):
+            line += f" - built with {', '.join(proj['technologies'])}"
+        lines.append(line)
+    return "Here are Viharahamed's main projects:\n" + "\n".join(lines) + "\n\nAsk me about any of them for more detail!"
+
+
+def _answer_certifications(data: Dict[str, Any], question: str) -> Optional[str]:
+    certifications = data.get('certifications', [])
+    if not certifications:
+        return None
+    lines = [
+        f"- {cert.get('name', 'Certification')}" + (f" (issued by {cert['issuer']})" if cert.get('issuer') else "")
+        for cert in certifications
+    ]
+    return "Viharahamed holds these certifications:\n" + "\n".join(lines)
+
+
+def _answer_skills(data: Dict[str, Any], question: str) -> Optional[str]:
+    skills = {k: v for k, v in data.get('technical_skills', {}).items() if isinstance(v, list) and v}
+    if not skills:
+        return None
+    
+    for category, terms in _SKILL_CATEGORY_TERMS.items():
+        if category in skills and any(term in question for term in terms):
+            label = category.replace('_', ' ')
+            return f"Viharahamed's {label}: {_join(skills[category])}."
+    
+    lines = [f"- {category.replace('_', ' ').title()}: {', '.join(names)}" for category, names in skills.items()]
+    return "Here's Viharahamed's technical skill set:\n" + "\n".join(lines)
+
+
+def _answer_experience(data: Dict[str, Any], question: str) -> Optional[str]:
+    internship = data.get('internship', {})
+    if not internship:
+        return None
+    answer = f"Viharahamed worked as a {internship.get('role', 'intern')} at {internship.get('company', 'a company')}"
+    if internship.get('period'):
+        answer += f" ({internship['period']})"
+    answer += "."
+    responsibilities = internship.get('responsibilities', [])
+    if responsibilities:
+        answer += " There he:\n" + "\n".join(f"- {item}" for item in responsibilities)
+    return answer
+
+
+_ANSWERS: Dict[str, Callable[[Dict[str, Any], str], Optional[str]]] = {
+    "contact_methods": _answer_contact,
+    "education_background": _answer_education,
+    "main_projects": _answer_projects,
+    "certifications": _answer_certifications,
+    "technical_expertise": _answer_skills,
+    "work_experience": _answer_experience,
+}
+
+
+class IntentRouter:
+    """Answers structured questions straight from resume data, without calling the model"""
+    
+    def __init__(self):
+        self.total = 0
+        self.handled = 0
+        self.by_intent: Dict[str, int] = {}
+    
+    def classify(self, message: str) -> Optional[str]:
+        """The single intent the message matches, or None if it matches none or several"""
+        question = normalize_question(message)
+        if not question or len(question.split()) > MAX_ROUTED_WORDS:
+            return None
+        matches = [
+            intent for intent, patterns in _INTENT_PATTERNS.items()
+            if any(pattern.match(question) for pattern in patterns)
+        ]
+        return matches[0] if len(matches) == 1 else None
+    
+    def route(self, message: str, resume_data: Dict[str, Any]) -> Optional[str]:
+        """Templated answer for the message, or None to fall through to the model"""
+        self.total += 1
+        intent = self.classify(message)
+        if intent is None:
+            return None
+        
+        answer = _ANSWERS[intent](resume_data, normalize_question(message))
+        if answer is None:
+            # No structured data for this intent; use the hand-written FAQ answer if any
+            answer = resume_data.get('faq_responses', {}).get(intent)
+        if not answer:
+            return None
+        
+        self.handled += 1
+        self.by_intent[intent] = self.by_intent.get(intent, 0) + 1
+        return answer
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "handled": self.handled,
+            "handled_fraction": round(self.handled / self.total, 4) if self.total else 0.0,
+            "by_intent": dict(self.by_intent)
+        }
+
+
+# Singleton instance
+intent_router = IntentRouter()
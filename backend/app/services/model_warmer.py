@@ -0,0 +1,151 @@
+import asyncio
+import re
+import time
+from typing import Any, Dict, List, Optional
+from app.config import get_settings
+from app.http_client import get_http_client
+
+settings = get_settings()
+
+# Go duration syntax, as Ollama parses keep_alive strings: "30m", "1h30m", "-1m", "1.5h"
+_NUMBER_RE = re.compile(r"^-?\d+(?:\.\d+)?$")
+_DURATION_RE = re.compile(r"^(-?)((?:\d+(?:\.\d+)?(?:ns|us|µs|ms|s|m|h))+)$")
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ns|us|µs|ms|s|m|h)")
+_UNIT_SECONDS = {"ns": 1e-9, "us": 1e-6, "µs": 1e-6, "ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_keep_alive(value: str) -> Optional[float]:
+    """
+    Seconds an Ollama keep_alive value keeps the model loaded (None = forever).
+    Accepts a Go duration ("30m", "1h30m") or a bare number of seconds; raises ValueError otherwise.
+    """
+    text = str(value).strip()
+    if _NUMBER_RE.match(text):
+        seconds = float(text)
+    else:
+        match = _DURATION_RE.match(text)
+        if not match:
+            raise ValueError(f"Invalid ollama_keep_alive '{value}': use a duration like '30m' or '1h30m', or seconds")
+        seconds = sum(float(amount) * _UNIT_SECONDS[unit] for amount, unit in _DURATION_PART_RE.findall(match.group(2)))
+        if match.group(1):
+            seconds = -seconds
+    return None if seconds < 0 else seconds
+
+
+def keep_alive_value(value: str) -> Any:
+    """keep_alive as sent to Ollama: bare numbers as JSON numbers (seconds), durations as strings"""
+    text = str(value).strip()
+    if _NUMBER_RE.match(text):
+        # Ollama reads strings as Go durations, which need a unit ("-1" would be rejected)
+        number = float(text)
+        return int(number) if number.is_integer() else number
+    return text
+
+
+class ModelWarmer:
+    """Loads the Ollama model ahead of the first chat and tracks cold vs. warm turns"""
+    
+    def __init__(self, model: str, keep_alive: str, cold_threshold: float):
+        self.model = model
+        self.keep_alive_seconds = parse_keep_alive(keep_alive)
+        self.keep_alive = keep_alive_value(keep_alive)
+        self.cold_threshold = cold_threshold
+        self._last_used: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "warmups": 0,
+            "warmup_failures": 0,
+            "cold_turns": 0,
+            "warm_turns": 0,
+            "load_seconds_total": 0.0
+        }
+    
+    def is_warm(self) -> bool:
+        """True if the model was used recently enough that keep_alive still holds it"""
+        if self._last_used is None:
+            return False
+        if self.keep_alive_seconds is None:
+            return True
+        # Leave a margin so a model about to be unloaded counts as cold
+        return time.monotonic() - self._last_used < self.keep_alive_seconds * 0.9
+    
+    def mark_used(self):
+        """Note that the model just served a request (restarts the keep_alive clock)"""
+        self._last_used = time.monotonic()
+    
+    def record_turn(self, ollama_stats: Dict[str, Any]):
+        """Classify a completed chat turn as cold or warm from Ollama's load_duration (ns)"""
+        self.mark_used()
+        load_seconds = (ollama_stats.get("load_duration") or 0) / 1e9
+        self.stats["load_seconds_total"] += load_seconds
+        if load_seconds >= self.cold_threshold:
+            self.stats["cold_turns"] += 1
+        else:
+            self.stats["warm_turns"] += 1
+    
+    def ensure_warm(self, api_urls: List[str], system_prompt: Optional[str]) -> str:
+        """Start warming every backend in the background unless the model is warm or already warming"""
+        if self._task is not None and not self._task.done():
+            return "warming"
+        if self.is_warm():
+            return "warm"
+        self._task = asyncio.create_task(self._warm_all(api_urls, system_prompt))
+        return "warming"
+    
+    async def _warm_all(self, api_urls: List[str], system_prompt: Optional[str]):
+        """Warm all backends concurrently; the model counts as warm if any of them loaded it"""
+        results = await asyncio.gather(*(self._warm(api_url, system_prompt) for api_url in api_urls))
+        if any(results):
+            self.mark_used()
+    
+    async def _warm(self, api_url: str, system_prompt: Optional[str]) -> bool:
+        """Load the model, then run the static system prompt through it to prime the prompt cache"""
+        client = get_http_client()
+        try:
+            response = await client.post(
+                f"{api_url}/api/generate",
+                json={"model": self.model, "keep_alive": self.keep_alive}
+            )
+            response.raise_for_status()
+            
+            if system_prompt:
+                response = await client.post(
+                    f"{api_url}/api/chat",
+                    json={
+                        "model": self.model,
+                        "messages": [
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": "Hi"}
+                        ],
+                        "stream": False,
+                        "keep_alive": self.keep_alive,
+                        "options": {"num_predict": 1}
+                    }
+                )
+                response.raise_for_status()
+        except Exception as e:
+            self.stats["warmup_failures"] += 1
+            print(f"Error warming up Ollama model {self.model} on {api_url}: {e}")
+            return False
+        self.stats["warmups"] += 1
+        return True
+    
+    async def stop(self):
+        """Cancel an in-flight warm-up (called on app shutdown)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "warm": self.is_warm()}
+
+
+# Singleton instance
+model_warmer = ModelWarmer(
+    model=settings.ollama_model,
+    keep_alive=settings.ollama_keep_alive,
+    cold_threshold=settings.ollama_cold_load_threshold
+)
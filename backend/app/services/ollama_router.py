@@ -0,0 +1,237 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+import httpx
+from app.config import get_settings
+from app.http_client import get_http_client
+from app.metrics import registry
+from app.tracing import span
+from app.services.cache import LRUTTLCache
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class Backend:
+    """One Ollama server and its health and load counters"""
+    
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.successes = 0
+        self.consecutive_failures = 0
+        self.latency_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+        self.last_error: Optional[str] = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        completed = self.successes
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "successes": self.successes,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_ms_avg": round(self.latency_seconds_total / completed * 1000, 1) if completed > 0 else None,
+            "latency_ms_max": round(self.latency_seconds_max * 1000, 1),
+            "last_error": self.last_error
+        }
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Connection-level failures and 5xx responses are worth retrying on another backend"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class OllamaRouter:
+    """
+    Spreads chat calls over several Ollama servers. Each call goes to the healthy backend
+    with the fewest outstanding requests, except that a session sticks to the backend that
+    served its previous turn (which still holds its prompt in the KV cache). A backend is
+    ejected after eject_after consecutive failures or a failed health probe, and rejoins
+    once a probe succeeds.
+    """
+    
+    def __init__(self, urls: List[str], eject_after: int, health_interval: float, health_timeout: float, max_sessions: int, session_ttl: float):
+        self.backends = [Backend(url.rstrip("/")) for url in urls]
+        self.eject_after = eject_after
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._affinity = LRUTTLCache(max_entries=max_sessions, ttl=session_ttl)
+        self._task: Optional[asyncio.Task] = None
+        self._next = 0
+        self.stats = {"affinity_hits": 0, "affinity_misses": 0, "failovers": 0}
+    
+    def set_urls(self, urls: List[str]):
+        """Replace the backend list (drops session affinity)"""
+        self.backends = [Backend(url.rstrip("/")) for url in urls]
+        self._affinity.clear()
+    
+    def healthy_urls(self) -> List[str]:
+        return [backend.url for backend in self.backends if backend.healthy]
+    
+    def pick(self, session_id: Optional[str] = None, exclude: frozenset = frozenset()) -> Backend:
+        """Choose a backend: the session's own if usable, else the least loaded healthy one"""
+        candidates = [b for b in self.backends if b.url not in exclude]
+        if not candidates:
+            raise RuntimeError("No Ollama backends configured")
+        
+        if session_id:
+            pinned = self._affinity.get(session_id)
+            if pinned is not None:
+                for backend in candidates:
+                    if backend.url == pinned and backend.healthy:
+                        self.stats["affinity_hits"] += 1
+                        return backend
+                self.stats["affinity_misses"] += 1
+        
+        # With everything ejected, still try something rather than fail outright
+        pool = [b for b in candidates if b.healthy] or candidates
+        fewest = min(b.outstanding for b in pool)
+        tied = [b for b in pool if b.outstanding == fewest]
+        # Rotate among equally loaded backends so idle traffic doesn't all land on the first
+        self._next += 1
+        return tied[self._next % len(tied)]
+    
+    def bind(self, session_id: Optional[str], backend: Backend):
+        """Pin a session to the backend that just served it"""
+        if session_id:
+            self._affinity.set(session_id, backend.url)
+    
+    @asynccontextmanager
+    async def track(self, backend: Backend) -> AsyncIterator[Backend]:
+        """Count one request against backend, recording its latency or failure"""
+        backend.outstanding += 1
+        backend.requests += 1
+        started = time.perf_counter()
+        try:
+            with span("ollama.request", backend=backend.url):
+                yield backend
+        except Exception as e:
+            self._record_failure(backend, e)
+            raise
+        else:
+            elapsed = time.perf_counter() - started
+            backend.latency_seconds_total += elapsed
+            backend.latency_seconds_max = max(backend.latency_seconds_max, elapsed)
+            backend.successes += 1
+            backend.consecutive_failures = 0
+        finally:
+            backend.outstanding -= 1
+    
+    def _record_failure(self, backend: Backend, error: BaseException):
+        backend.errors += 1
+        backend.last_error = f"{type(error).__name__}: {error}"
+        if not is_retryable(error):
+            return
+        backend.consecutive_failures += 1
+        if backend.healthy and backend.consecutive_failures >= self.eject_after:
+            backend.healthy = False
+            print(f"Ejecting Ollama backend {backend.url} after {backend.consecutive_failures} failures")
+    
+    def should_failover(self, error: BaseException, tried: set) -> bool:
+        """Retry on another backend if the error allows it and one is left to try"""
+        if is_retryable(error) and len(tried) < len(self.backends):
+            self.stats["failovers"] += 1
+            return True
+        return False
+    
+    async def call(self, session_id: Optional[str], send: Callable[[str], Awaitable[T]]) -> T:
+        """Run send(base_url) on a backend, failing over to the others on retryable errors"""
+        tried: set = set()
+        while True:
+            backend = self.pick(session_id, exclude=frozenset(tried))
+            tried.add(backend.url)
+            try:
+                async with self.track(backend):
+                    result = await send(backend.url)
+            except Exception as e:
+                if self.should_failover(e, tried):
+                    continue
+                raise
+            self.bind(session_id, backend)
+            return result
+    
+    async def probe(self, backend: Backend):
+        """Mark backend healthy if it answers /api/tags, otherwise eject it"""
+        try:
+            response = await get_http_client().get(f"{backend.url}/api/tags", timeout=self.health_timeout)
+            response.raise_for_status()
+        except Exception as e:
+            if backend.healthy:
+                print(f"Ollama backend {backend.url} failed its health check: {e}")
+            backend.healthy = False
+            backend.last_error = f"{type(e).__name__}: {e}"
+            return
+        if not backend.healthy:
+            print(f"Ollama backend {backend.url} is back")
+        backend.healthy = True
+        backend.consecutive_failures = 0
+    
+    async def _watch(self):
+        while True:
+            await asyncio.gather(*(self.probe(backend) for backend in self.backends))
+            await asyncio.sleep(self.health_interval)
+    
+    async def start(self):
+        """Start active health checks (only useful with more than one backend)"""
+        if len(self.backends) > 1 and self.health_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "sessions_pinned": len(self._affinity),
+            "backends": [backend.get_stats() for backend in self.backends]
+        }
+
+
+def configured_urls() -> List[str]:
+    """ollama_backend_urls if set, else the single ollama_url"""
+    urls = [url.strip() for url in settings.ollama_backend_urls.split(",") if url.strip()]
+    return urls or [settings.ollama_url]
+
+
+# Singleton instance
+ollama_router = OllamaRouter(
+    urls=configured_urls(),
+    eject_after=settings.ollama_eject_after_failures,
+    health_interval=settings.ollama_health_interval,
+    health_timeout=settings.ollama_health_timeout,
+    max_sessions=settings.history_cache_max_sessions,
+    session_ttl=settings.history_cache_idle_ttl
+)
+
+registry.callback(
+    "ollama_backend_healthy", "1 if the Ollama backend is in rotation",
+    lambda: {(backend.url,): int(backend.healthy) for backend in ollama_router.backends},
+    labelnames=("backend",)
+)
+registry.callback(
+    "ollama_backend_outstanding", "Requests in flight per Ollama backend",
+    lambda: {(backend.url,): backend.outstanding for backend in ollama_router.backends},
+    labelnames=("backend",)
+)
+registry.callback(
+    "ollama_backend_errors", "Failed requests per Ollama backend",
+    lambda: {(backend.url,): backend.errors for backend in ollama_router.backends},
+    labelnames=("backend",), type="counter"
+)
@@ -1,6 +1,81 @@
+import asyncio
+import hashlib
 import json
-from typing import List, Dict, Any
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
 from pathlib import Path
+from app.config import get_settings
+from app.services.retrieval import Chunk, LexicalIndex
+from app.tracing import span
+
+settings = get_settings()
+
+# Top-level sections that must have these types when present
+_SECTION_TYPES = {
+    'personal_info': dict,
+    'education': dict,
+    'projects': list,
+    'internship': dict,
+    'technical_skills': dict,
+    'certifications': list,
+    'domain_expertise': list,
+    'key_strengths': list,
+    'conversation_context': dict,
+    'faq_responses': dict
+}
+
+
+# Chunks used when a question matches nothing in the index (e.g. "hi")
+DEFAULT_CHUNK_KEYS = ("faq:about_me",)
+
+# Extra retrieval terms for FAQ entries whose key contains the given word
+_FAQ_KEYWORDS = {
+    'contact': ('email', 'mail', 'phone', 'call', 'reach', 'linkedin', 'github', 'hire', 'connect')
+}
+
+
+@dataclass(frozen=True)
+class ResumeSnapshot:
+    """Resume data plus everything derived from it, compiled once and never mutated"""
+    data: Dict[str, Any]
+    version: str
+    context: str
+    header: str
+    chunks: tuple
+    index: LexicalIndex
+
+
+def compute_resume_version(resume_data: Dict[str, Any]) -> str:
+    """Content hash of the resume data; changes whenever the data does"""
+    canonical = json.dumps(resume_data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def compile_snapshot(resume_data: Dict[str, Any]) -> ResumeSnapshot:
+    """Build an immutable snapshot with its version, rendered AI context and retrieval index"""
+    chunks = tuple(chunk_resume(resume_data))
+    return ResumeSnapshot(
+        data=resume_data,
+        version=compute_resume_version(resume_data),
+        context=render_resume_context(resume_data),
+        header=render_context_header(resume_data),
+        chunks=chunks,
+        index=LexicalIndex(chunks)
+    )
+
+
+def validate_resume_data(resume_data: Any):
+    """Raise ValueError if the data can't be served as a resume"""
+    if not isinstance(resume_data, dict):
+        raise ValueError("resume data must be a JSON object")
+    if not isinstance(resume_data.get('personal_info'), dict):
+        raise ValueError("resume data must contain a 'personal_info' object")
+    for section, expected in _SECTION_TYPES.items():
+        if section in resume_data and not isinstance(resume_data[section], expected):
+            raise ValueError(f"'{section}' must be a JSON {'object' if expected is dict else 'array'}")
+    for i, project in enumerate(resume_data.get('projects', [])):
+        if not isinstance(project, dict):
+            raise ValueError(f"projects[{i}] must be a JSON object")
 
 
 class ResumeService:
@@ -9,7 +84,23 @@ class ResumeService:
     def __init__(self):
         # Load resume data from JSON file
         self.data_path = Path(__file__).parent.parent.parent / "data" / "resume_knowledge.json"
-        self.resume_data = self._load_resume_data()
+        self._file_signature = self._stat_signature()
+        self._snapshot = compile_snapshot(self._load_resume_data())
+        self._watch_task: Optional[asyncio.Task] = None
+    
+    @property
+    def resume_data(self) -> Dict[str, Any]:
+        """Raw resume data of the current snapshot"""
+        return self._snapshot.data
+    
+    @property
+    def version(self) -> str:
+        """Content version of the current snapshot, for keying downstream caches"""
+        return self._snapshot.version
+    
+    def get_snapshot(self) -> ResumeSnapshot:
+        """Current resume snapshot"""
+        return self._snapshot
     
     def _load_resume_data(self) -> Dict[str, Any]:
         """Load resume data from JSON file"""
@@ -24,10 +115,77 @@ class ResumeService:
             print(f"Error loading resume data: {e}")
             return {}
     
+    def _stat_signature(self) -> Optional[tuple]:
+        """(mtime, size) of the knowledge file, or None if it is missing"""
+        try:
+            stat = self.data_path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _read_snapshot(self) -> ResumeSnapshot:
+        """Parse, validate and compile the knowledge file; raises on any problem"""
+        with open(self.data_path, 'r', encoding='utf-8') as f:
+            resume_data = json.load(f)
+        validate_resume_data(resume_data)
+        return compile_snapshot(resume_data)
+    
+    async def reload(self) -> bool:
+        """
+        Reload the knowledge file off the event loop and swap in the new snapshot.
+        The current snapshot is kept if the file is unreadable or invalid.
+        Returns True if a new version was installed.
+        """
+        signature = await asyncio.to_thread(self._stat_signature)
+        try:
+            with span("resume.reload"):
+                snapshot = await asyncio.to_thread(self._read_snapshot)
+        except Exception as e:
+            print(f"Error reloading resume data, keeping version {self.version}: {e}")
+            self._file_signature = signature
+            return False
+        
+        self._file_signature = signature
+        if snapshot.version == self._snapshot.version:
+            return False
+        
+        # A single reference assignment: readers see either the old or the new snapshot
+        previous = self._snapshot.version
+        self._snapshot = snapshot
+        print(f"Reloaded resume data: version {previous} -> {snapshot.version}")
+        return True
+    
+    async def _watch(self, interval: float):
+        """Poll the knowledge file's mtime/size and reload when it changes"""
+        while True:
+            await asyncio.sleep(interval)
+            signature = await asyncio.to_thread(self._stat_signature)
+            if signature is not None and signature != self._file_signature:
+                await self.reload()
+    
+    async def start_watcher(self):
+        """Start hot reload if enabled in settings (called on app startup)"""
+        if settings.resume_reload_mode != "poll":
+            return
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch(settings.resume_reload_interval))
+    
+    async def stop_watcher(self):
+        """Stop hot reload (called on app shutdown)"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+    
     async def get_profile(self) -> Dict[str, Any]:
         """Get profile information"""
-        personal = self.resume_data.get('personal_info', {})
-        education = self.resume_data.get('education', {}).get('current', {})
+        # Read the snapshot once so a concurrent reload can't mix two versions
+        resume_data = self.resume_data
+        personal = resume_data.get('personal_info', {})
+        education = resume_data.get('education', {}).get('current', {})
         
         # Return in format expected by frontend
         return {
@@ -96,119 +254,265 @@ class ResumeService:
         
         return skills_list
     
+    async def get_bootstrap(self) -> Dict[str, Any]:
+        """Get every portfolio section plus the resume version in one payload"""
+        # None of the getters suspend, so all sections come from the same snapshot
+        return {
+            'version': self.version,
+            'profile': await self.get_profile(),
+            'experiences': await self.get_experiences(),
+            'projects': await self.get_projects(),
+            'skills': await self.get_skills()
+        }
+    
     async def get_full_resume_context(self) -> str:
-        """Get complete resume as formatted text for AI context"""
-        if not self.resume_data:
-            return "No resume information available."
-        
-        context = "=== VIHARAHAMED M - PORTFOLIO INFORMATION ===\n\n"
-        
-        # Personal Information
-        personal = self.resume_data.get('personal_info', {})
-        if personal:
-            context += "📋 PERSONAL INFORMATION:\n"
-            context += f"Name: {personal.get('name', 'N/A')}\n"
-            context += f"Email: {personal.get('email', 'N/A')}\n"
-            context += f"Phone: {personal.get('phone', 'N/A')}\n"
-            context += f"LinkedIn: {personal.get('linkedin', 'N/A')}\n"
-            context += f"GitHub: {personal.get('github', 'N/A')}\n"
-            context += f"Location: {personal.get('location', 'N/A')}\n\n"
-        
-        # Education
-        education = self.resume_data.get('education', {})
-        if education:
-            context += "🎓 EDUCATION:\n"
-            current = education.get('current', {})
-            if current:
-                context += f"Current: {current.get('degree', 'N/A')}\n"
-                context += f"  Institution: {current.get('institution', 'N/A')}\n"
-                context += f"  Location: {current.get('location', 'N/A')}\n"
-                context += f"  CGPA: {current.get('cgpa', 'N/A')} (Up to {current.get('upto_semester', 'N/A')})\n"
-                context += f"  Expected Graduation: {current.get('expected_graduation', 'N/A')}\n"
-            
-            hsc = education.get('hsc', {})
-            if hsc:
-                context += f"HSC ({hsc.get('year', 'N/A')}): {hsc.get('percentage', 'N/A')} - {hsc.get('institution', 'N/A')}\n"
-            
-            sslc = education.get('sslc', {})
-            if sslc:
-                context += f"SSLC ({sslc.get('year', 'N/A')}): {sslc.get('institution', 'N/A')}\n"
-            context += "\n"
-        
-        # Projects
-        projects = self.resume_data.get('projects', [])
-        if projects:
-            context += "💼 PROJECTS:\n"
-            for i, proj in enumerate(projects, 1):
-                context += f"{i}. {proj.get('name', 'N/A')} ({proj.get('type', 'N/A')})\n"
-                context += f"   Description: {proj.get('description', 'N/A')}\n"
-                
-                technologies = proj.get('technologies', [])
-                if technologies:
-                    context += f"   Technologies: {', '.join(technologies)}\n"
-                
-                highlights = proj.get('highlights', [])
-                if highlights:
-                    context += "   Key Features:\n"
-                    for highlight in highlights:
-                        context += f"   - {highlight}\n"
-                context += "\n"
-        
-        # Internship
-        internship = self.resume_data.get('internship', {})
-        if internship:
-            context += "🏢 INTERNSHIP EXPERIENCE:\n"
-            context += f"Company: {internship.get('company', 'N/A')}\n"
-            context += f"Role: {internship.get('role', 'N/A')}\n"
-            context += f"Location: {internship.get('location', 'N/A')}\n"
-            context += f"Period: {internship.get('period', 'N/A')}\n"
-            
-            responsibilities = internship.get('responsibilities', [])
-            if responsibilities:
-                context += "Responsibilities:\n"
-                for resp in responsibilities:
-                    context += f"- {resp}\n"
-            context += "\n"
-        
-        # Technical Skills
-        skills = self.resume_data.get('technical_skills', {})
-        if skills:
-            context += "🛠️ TECHNICAL SKILLS:\n"
-            for category, skill_list in skills.items():
-                if isinstance(skill_list, list):
-                    context += f"{category.replace('_', ' ').title()}: {', '.join(skill_list)}\n"
-            context += "\n"
-        
-        # Certifications
-        certifications = self.resume_data.get('certifications', [])
-        if certifications:
-            context += "📜 CERTIFICATIONS:\n"
-            for cert in certifications:
-                context += f"- {cert.get('name', 'N/A')} (Issuer: {cert.get('issuer', 'N/A')})\n"
-            context += "\n"
-        
-        # Domain Expertise
-        domains = self.resume_data.get('domain_expertise', [])
-        if domains:
-            context += "🎯 DOMAIN EXPERTISE:\n"
-            context += f"{', '.join(domains)}\n\n"
-        
-        # Key Strengths
-        strengths = self.resume_data.get('key_strengths', [])
-        if strengths:
-            context += "💪 KEY STRENGTHS:\n"
-            for strength in strengths:
-                context += f"- {strength}\n"
-            context += "\n"
-        
-        # FAQ Context for better AI responses
-        faq = self.resume_data.get('faq_responses', {})
-        if faq:
-            context += "=== QUICK REFERENCE FOR COMMON QUESTIONS ===\n"
-            for question, answer in faq.items():
-                context += f"\n{question.replace('_', ' ').title()}:\n{answer}\n"
+        """Get complete resume as formatted text for AI context (rendered once per snapshot)"""
+        return self._snapshot.context
+    
+    async def get_retrieved_context(self, query: str, top_k: int) -> str:
+        """Get the always-on header plus the top_k resume sections most relevant to the query"""
+        snapshot = self._snapshot
+        if not snapshot.data:
+            return snapshot.context
         
-        return context
+        with span("resume.retrieve", top_k=top_k):
+            keys = {chunk.key for chunk, _ in snapshot.index.search(query, top_k)}
+            if not keys:
+                keys = set(DEFAULT_CHUNK_KEYS)
+            return render_chunks(snapshot, keys)
+
+
+def _render_personal(personal: Dict[str, Any]) -> str:
+    parts = ["📋 PERSONAL INFORMATION:\n"]
+    parts.append(f"Name: {personal.get('name', 'N/A')}\n")
+    parts.append(f"Email: {personal.get('email', 'N/A')}\n")
+    parts.append(f"Phone: {personal.get('phone', 'N/A')}\n")
+    parts.append(f"LinkedIn: {personal.get('linkedin', 'N/A')}\n")
+    parts.append(f"GitHub: {personal.get('github', 'N/A')}\n")
+    parts.append(f"Location: {personal.get('location', 'N/A')}\n\n")
+    return "".join(parts)
+
+
+def _render_education(education: Dict[str, Any]) -> str:
+    parts = ["🎓 EDUCATION:\n"]
+    current = education.get('current', {})
+    if current:
+        parts.append(f"Current: {current.get('degree', 'N/A')}\n")
+        parts.append(f"  Institution: {current.get('institution', 'N/A')}\n")
+        parts.append(f"  Location: {current.get('location', 'N/A')}\n")
+        parts.append(f"  CGPA: {current.get('cgpa', 'N/A')} (Up to {current.get('upto_semester', 'N/A')})\n")
+        parts.append(f"  Expected Graduation: {current.get('expected_graduation', 'N/A')}\n")
+    
+    hsc = education.get('hsc', {})
+    if hsc:
+        parts.append(f"HSC ({hsc.get('year', 'N/A')}): {hsc.get('percentage', 'N/A')} - {hsc.get('institution', 'N/A')}\n")
+    
+    sslc = education.get('sslc', {})
+    if sslc:
+        parts.append(f"SSLC ({sslc.get('year', 'N/A')}): {sslc.get('institution', 'N/A')}\n")
+    parts.append("\n")
+    return "".join(parts)
+
+
+def _render_project(number: int, proj: Dict[str, Any]) -> str:
+    parts = [f"{number}. {proj.get('name', 'N/A')} ({proj.get('type', 'N/A')})\n"]
+    parts.append(f"   Description: {proj.get('description', 'N/A')}\n")
+    
+    technologies = proj.get('technologies', [])
+    if technologies:
+        parts.append(f"   Technologies: {', '.join(technologies)}\n")
+    
+    highlights = proj.get('highlights', [])
+    if highlights:
+        parts.append("   Key Features:\n")
+        for highlight in highlights:
+            parts.append(f"   - {highlight}\n")
+    parts.append("\n")
+    return "".join(parts)
+
+
+def _render_internship(internship: Dict[str, Any]) -> str:
+    parts = ["🏢 INTERNSHIP EXPERIENCE:\n"]
+    parts.append(f"Company: {internship.get('company', 'N/A')}\n")
+    parts.append(f"Role: {internship.get('role', 'N/A')}\n")
+    parts.append(f"Location: {internship.get('location', 'N/A')}\n")
+    parts.append(f"Period: {internship.get('period', 'N/A')}\n")
+    
+    responsibilities = internship.get('responsibilities', [])
+    if responsibilities:
+        parts.append("Responsibilities:\n")
+        for resp in responsibilities:
+            parts.append(f"- {resp}\n")
+    parts.append("\n")
+    return "".join(parts)
+
+
+def _render_skills(skills: Dict[str, Any]) -> str:
+    parts = ["🛠️ TECHNICAL SKILLS:\n"]
+    for category, skill_list in skills.items():
+        if isinstance(skill_list, list):
+            parts.append(f"{category.replace('_', ' ').title()}: {', '.join(skill_list)}\n")
+    parts.append("\n")
+    return "".join(parts)
+
+
+def _render_certifications(certifications: List[Dict[str, Any]]) -> str:
+    parts = ["📜 CERTIFICATIONS:\n"]
+    for cert in certifications:
+        parts.append(f"- {cert.get('name', 'N/A')} (Issuer: {cert.get('issuer', 'N/A')})\n")
+    parts.append("\n")
+    return "".join(parts)
+
+
+def _render_domains(domains: List[str]) -> str:
+    return f"🎯 DOMAIN EXPERTISE:\n{', '.join(domains)}\n\n"
+
+
+def _render_strengths(strengths: List[str]) -> str:
+    return "💪 KEY STRENGTHS:\n" + "".join(f"- {strength}\n" for strength in strengths) + "\n"
+
+
+def _render_faq_entry(question: str, answer: str) -> str:
+    return f"\n{question.replace('_', ' ').title()}:\n{answer}\n"
+
+
+CONTEXT_TITLE = "=== VIHARAHAMED M - PORTFOLIO INFORMATION ===\n\n"
+PROJECTS_HEADING = "💼 PROJECTS:\n"
+FAQ_HEADING = "=== QUICK REFERENCE FOR COMMON QUESTIONS ===\n"
+
+
+def render_resume_context(resume_data: Dict[str, Any]) -> str:
+    """Render resume data as formatted text for AI context"""
+    if not resume_data:
+        return "No resume information available."
+    
+    parts = [CONTEXT_TITLE]
+    
+    # Personal Information
+    personal = resume_data.get('personal_info', {})
+    if personal:
+        parts.append(_render_personal(personal))
+    
+    # Education
+    education = resume_data.get('education', {})
+    if education:
+        parts.append(_render_education(education))
+    
+    # Projects
+    projects = resume_data.get('projects', [])
+    if projects:
+        parts.append(PROJECTS_HEADING)
+        for i, proj in enumerate(projects, 1):
+            parts.append(_render_project(i, proj))
+    
+    # Internship
+    internship = resume_data.get('internship', {})
+    if internship:
+        parts.append(_render_internship(internship))
+    
+    # Technical Skills
+    skills = resume_data.get('technical_skills', {})
+    if skills:
+        parts.append(_render_skills(skills))
+    
+    # Certifications
+    certifications = resume_data.get('certifications', [])
+    if certifications:
+        parts.append(_render_certifications(certifications))
+    
+    # Domain Expertise
+    domains = resume_data.get('domain_expertise', [])
+    if domains:
+        parts.append(_render_domains(domains))
+    
+    # Key Strengths
+    strengths = resume_data.get('key_strengths', [])
+    if strengths:
+        parts.append(_render_strengths(strengths))
+    
+    # FAQ Context for better AI responses
+    faq = resume_data.get('faq_responses', {})
+    if faq:
+        parts.append(FAQ_HEADING)
+        for question, answer in faq.items():
+            parts.append(_render_faq_entry(question, answer))
+    
+    return "".join(parts)
+
+
+def render_context_header(resume_data: Dict[str, Any]) -> str:
+    """Compact header sent with every retrieved context: title and contact details"""
+    if not resume_data:
+        return "No resume information available."
+    personal = resume_data.get('personal_info', {})
+    return CONTEXT_TITLE + (_render_personal(personal) if personal else "")
+
+
+def chunk_resume(resume_data: Dict[str, Any]) -> List[Chunk]:
+    """Split resume data into addressable sections for retrieval, in document order"""
+    chunks = []
+    
+    education = resume_data.get('education', {})
+    if education:
+        chunks.append(Chunk('education', _render_education(education), (
+            'education', 'college', 'university', 'degree', 'cgpa', 'gpa', 'grades',
+            'school', 'study', 'studying', 'graduation', 'marks', 'qualification'
+        )))
+    
+    for i, proj in enumerate(resume_data.get('projects', []), 1):
+        chunks.append(Chunk(f'project:{i}', _render_project(i, proj), ('project', 'projects', 'built', 'build', 'portfolio')))
+    
+    internship = resume_data.get('internship', {})
+    if internship:
+        chunks.append(Chunk('internship', _render_internship(internship), (
+            'internship', 'intern', 'experience', 'work', 'worked', 'job', 'company', 'role', 'professional'
+        )))
+    
+    skills = resume_data.get('technical_skills', {})
+    if skills:
+        chunks.append(Chunk('skills', _render_skills(skills), (
+            'skills', 'skill', 'technologies', 'technology', 'tech', 'stack', 'languages',
+            'programming', 'frameworks', 'tools', 'proficient', 'expertise'
+        )))
+    
+    certifications = resume_data.get('certifications', [])
+    if certifications:
+        chunks.append(Chunk('certifications', _render_certifications(certifications), (
+            'certification', 'certifications', 'certificate', 'certificates', 'certified', 'courses', 'course'
+        )))
+    
+    domains = resume_data.get('domain_expertise', [])
+    if domains:
+        chunks.append(Chunk('domains', _render_domains(domains), ('domain', 'domains', 'expertise', 'areas', 'interests', 'specialize')))
+    
+    strengths = resume_data.get('key_strengths', [])
+    if strengths:
+        chunks.append(Chunk('strengths', _render_strengths(strengths), ('strengths', 'strength', 'strong', 'qualities', 'good')))
+    
+    for question, answer in resume_data.get('faq_responses', {}).items():
+        words = question.split('_')
+        keywords = tuple(words) + tuple(k for word in words for k in _FAQ_KEYWORDS.get(word, ()))
+        chunks.append(Chunk(f'faq:{question}', _render_faq_entry(question, answer), keywords))
+    
+    return chunks
+
+
+def render_chunks(snapshot: ResumeSnapshot, keys: set) -> str:
+    """Header plus the selected chunks in document order, with their section headings"""
+    parts = [snapshot.header]
+    heading = None
+    for chunk in snapshot.chunks:
+        if chunk.key not in keys:
+            continue
+        group = chunk.key.split(':', 1)[0]
+        if group != heading:
+            if group == 'project':
+                parts.append(PROJECTS_HEADING)
+            elif group == 'faq':
+                parts.append(FAQ_HEADING)
+            heading = group
+        parts.append(chunk.text)
+    return "".join(parts)
 
 
 # Singleton instance
@@ -0,0 +1,75 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.+#][a-z0-9]+)*[+#]*")
+
+# Words that carry no topical signal in visitor questions
+STOPWORDS = frozenset("""
+a an and any are as at be been but by can could did do does for from had has have he her
+him his how i if in into is it its just me more my of on or our please so some tell than
+that the their them then there these they this to us was we were what when where which who
+why will with would you your yours about give know like want
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms for lexical matching; 'node.js' also yields 'node' and 'js'"""
+    terms = []
+    for term in _TOKEN_RE.findall(text.lower()):
+        if term in STOPWORDS or len(term) < 2:
+            continue
+        terms.append(term)
+        if '.' in term:
+            terms.extend(part for part in term.split('.') if part and part not in STOPWORDS)
+    return terms
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """An addressable piece of the knowledge base"""
+    key: str
+    text: str
+    # Extra terms that describe the chunk but aren't in its text (e.g. 'contact', 'faq')
+    keywords: Tuple[str, ...] = ()
+
+
+class LexicalIndex:
+    """
+    BM25 index over a fixed set of chunks.
+    Per-term BM25 weights are computed once at build time and stored as postings,
+    so scoring a query is a sparse sum over the query's terms with no per-chunk loop.
+    """
+    
+    def __init__(self, chunks: Sequence[Chunk], k1: float = 1.2, b: float = 0.75):
+        self.chunks = list(chunks)
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        
+        term_counts = [Counter(tokenize(c.text) + tokenize(" ".join(c.keywords))) for c in self.chunks]
+        lengths = [sum(counts.values()) for counts in term_counts]
+        n = len(self.chunks)
+        avg_length = (sum(lengths) / n) if n else 0.0
+        
+        document_frequency: Counter = Counter()
+        for counts in term_counts:
+            document_frequency.update(counts.keys())
+        
+        idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+        
+        # One pass over each chunk's terms; postings stay in chunk order
+        for i, counts in enumerate(term_counts):
+            norm = k1 * (1 - b + b * lengths[i] / avg_length) if avg_length else k1
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((i, idf[term] * tf * (k1 + 1) / (tf + norm)))
+    
+    def search(self, query: str, top_k: int) -> List[Tuple[Chunk, float]]:
+        """Best matching chunks for the query, highest score first (only scores > 0)"""
+        scores = [0.0] * len(self.chunks)
+        for term in set(tokenize(query)):
+            for i, weight in self._postings.get(term, ()):
+                scores[i] += weight
+        
+        ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: -scores[i])
+        return [(self.chunks[i], scores[i]) for i in ranked[:top_k]]
@@ -0,0 +1,152 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict
+from app.config import get_settings
+from app.metrics import registry
+
+settings = get_settings()
+
+
+class AdmissionRejected(Exception):
+    """The LLM is saturated; the caller should retry after `retry_after` seconds"""
+    
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class QueueFullError(AdmissionRejected):
+    """The wait queue is at capacity"""
+
+
+class QueueTimeoutError(AdmissionRejected):
+    """The request waited longer than its queue deadline"""
+
+
+class AdmissionController:
+    """
+    Caps concurrent LLM generations at max_in_flight. Excess requests wait in a
+    bounded FIFO queue until a slot frees up or their queue deadline passes;
+    when the queue is full they are rejected immediately.
+    """
+    
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "service_seconds_total": 0.0,
+            "completed": 0
+        }
+    
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+    
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+    
+    def _retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the average generation time"""
+        if not self.stats["completed"]:
+            return self.retry_after
+        average = self.stats["service_seconds_total"] / self.stats["completed"]
+        estimate = average * (self.queue_depth + 1) / self.max_in_flight
+        return max(1, min(math.ceil(estimate), 120))
+    
+    async def _acquire(self) -> float:
+        """Take a slot, waiting in the queue if needed; returns seconds spent waiting"""
+        if self._in_flight < self.max_in_flight and not self.queue_depth:
+            self._in_flight += 1
+            return 0.0
+        
+        if self.queue_depth >= self.max_queue:
+            self.stats["rejected_queue_full"] += 1
+            raise QueueFullError("LLM queue is full", self._retry_after())
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self._release()
+            else:
+                waiter.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats["rejected_timeout"] += 1
+                raise QueueTimeoutError("Timed out waiting for the LLM", self._retry_after())
+            raise
+        return time.perf_counter() - started
+    
+    def _release(self):
+        """Hand the slot to the oldest live waiter, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+    
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[Dict[str, Any]]:
+        """Hold one LLM slot for the duration of the block; yields {'wait_seconds': ...}"""
+        wait = await self._acquire()
+        self.stats["admitted"] += 1
+        self.stats["wait_seconds_total"] += wait
+        self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], wait)
+        started = time.perf_counter()
+        try:
+            yield {"wait_seconds": wait}
+        finally:
+            self.stats["service_seconds_total"] += time.perf_counter() - started
+            self.stats["completed"] += 1
+            self._release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        admitted = self.stats["admitted"]
+        return {
+            **self.stats,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "wait_seconds_avg": round(self.stats["wait_seconds_total"] / admitted, 4) if admitted else 0.0
+        }
+
+
+# Singleton instance
+llm_scheduler = AdmissionController(
+    max_in_flight=settings.llm_max_in_flight,
+    max_queue=settings.llm_max_queue,
+    queue_timeout=settings.llm_queue_timeout,
+    retry_after=settings.llm_retry_after
+)
+
+registry.callback("llm_queue_depth", "Requests waiting for an LLM slot", lambda: {(): llm_scheduler.queue_depth})
+registry.callback("llm_in_flight", "LLM generations running", lambda: {(): llm_scheduler.in_flight})
+registry.callback(
+    "llm_admission_rejections", "Requests turned away with a 503",
+    lambda: {
+        ("queue_full",): llm_scheduler.stats["rejected_queue_full"],
+        ("timeout",): llm_scheduler.stats["rejected_timeout"]
+    },
+    labelnames=("reason",), type="counter"
+)
@@ -0,0 +1,138 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class FlightAbandoned(RuntimeError):
+    """The shared generation stopped before producing a reply (e.g. every subscriber left)"""
+
+
+class Flight:
+    """One shared generation: a growing token log that any number of subscribers replay and follow"""
+    
+    def __init__(self, key: Hashable, owner: "SingleFlight"):
+        self.key = key
+        self.parts: list[str] = []
+        self.stats: dict = {}
+        self.error: Optional[BaseException] = None
+        self.finished = False
+        self.subscribers = 0
+        # Sessions of everyone who joined, pinned to the backend that serves the flight
+        self.session_ids: List[str] = []
+        self.task: Optional[asyncio.Task] = None
+        self._owner = owner
+        self._admitted: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._wake = asyncio.Event()
+    
+    def admit(self, wait_seconds: float):
+        """Called by the generation once it holds an LLM slot"""
+        if not self._admitted.done():
+            self._admitted.set_result(wait_seconds)
+    
+    def publish(self, part: str):
+        self.parts.append(part)
+        self._notify()
+    
+    def finish(self, error: Optional[BaseException] = None):
+        # Subscribers get an ordinary exception: a CancelledError would read as their own cancellation
+        if isinstance(error, asyncio.CancelledError):
+            error = FlightAbandoned("shared generation was cancelled")
+        self.finished = True
+        self.error = error
+        if not self._admitted.done():
+            self._admitted.set_exception(error or FlightAbandoned("shared generation ended before admission"))
+            # Mark it retrieved so an unobserved failure isn't logged as "never retrieved"
+            self._admitted.exception()
+        self._notify()
+    
+    def _notify(self):
+        self._wake.set()
+        self._wake = asyncio.Event()
+    
+    @asynccontextmanager
+    async def admission(self) -> AsyncIterator[Dict[str, Any]]:
+        """Wait until the shared generation is admitted, then hold this subscription until exit"""
+        try:
+            # Shielded so one subscriber giving up doesn't cancel the shared future
+            wait = await asyncio.shield(self._admitted)
+            yield {"wait_seconds": wait}
+        finally:
+            self._owner.leave(self)
+    
+    async def follow(self) -> AsyncIterator[str]:
+        """Replay the tokens published so far, then follow new ones until the generation ends"""
+        index = 0
+        while True:
+            if index < len(self.parts):
+                index += 1
+                yield self.parts[index - 1]
+                continue
+            if self.finished:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._wake.wait()
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical generations. The first caller for a key starts the
+    work as a detached task; later callers subscribe to the same Flight until it finishes.
+    The task is cancelled once every subscriber has left.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[Hashable, Flight] = {}
+        self.stats = {"started": 0, "coalesced": 0, "abandoned": 0}
+    
+    def join(self, key: Hashable, start: Callable[[Flight], Awaitable[None]], session_id: Optional[str] = None) -> Flight:
+        """Subscribe to the in-flight generation for key, starting it if there is none"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = Flight(key, self)
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._run(flight, start))
+            flight.task.add_done_callback(lambda task: self._on_done(flight))
+            self.stats["started"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        flight.subscribers += 1
+        if session_id:
+            flight.session_ids.append(session_id)
+        return flight
+    
+    def leave(self, flight: Flight):
+        flight.subscribers -= 1
+        if flight.subscribers <= 0 and not flight.finished and flight.task is not None:
+            self.stats["abandoned"] += 1
+            # Unlist it before cancelling, so callers arriving while it winds down start a fresh flight
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            flight.task.cancel()
+    
+    async def _run(self, flight: Flight, start: Callable[[Flight], Awaitable[None]]):
+        try:
+            await start(flight)
+        except asyncio.CancelledError as e:
+            flight.finish(e)
+        except Exception as e:
+            flight.finish(e)
+        else:
+            flight.finish()
+        finally:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+    
+    def _on_done(self, flight: Flight):
+        """A task cancelled before it first runs never enters _run; finish its flight here"""
+        if not flight.finished:
+            flight.finish(FlightAbandoned("shared generation was cancelled"))
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "in_flight": len(self._flights)}
+
+
+# Singleton instance
+single_flight = SingleFlight()
@@ -0,0 +1,15 @@
+import re
+
+# Words, numbers and individual punctuation marks
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token-count estimate for prompt budgeting.
+    Subword tokenizers average ~4 characters per token on English text; taking the
+    larger of that and the word/punctuation count keeps short, symbol-heavy text honest.
+    """
+    if not text:
+        return 0
+    return max(len(text) // 4, len(_PIECE_RE.findall(text)))
@@ -0,0 +1 @@
+# Chat history storage package
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from app.tracing import span
+
+
+def utc_timestamp() -> str:
+    """created_at value for a new chat_history row"""
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ChatHistoryStore:
+    """
+    Where chat_history rows live. Rows are dicts with session_id, role, content
+    and created_at; implementations only provide _fetch_recent and _append_many.
+    """
+    
+    name = "base"
+    
+    async def fetch_recent(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        """A session's most recent messages (role, content), oldest first"""
+        with span("db.fetch_chat_history", store=self.name):
+            return await self._fetch_recent(session_id, limit)
+    
+    async def append_many(self, rows: List[Dict[str, Any]]):
+        """Insert several rows in one round-trip"""
+        if not rows:
+            return
+        with span("db.insert_chat_messages", store=self.name, rows=len(rows)):
+            await self._append_many(rows)
+    
+    async def append(self, session_id: str, role: str, content: str):
+        """Insert a single message stamped with the current time"""
+        await self.append_many([{
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "created_at": utc_timestamp()
+        }])
+    
+    async def close(self):
+        """Release connections (called on app shutdown)"""
+    
+    async def _fetch_recent(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+    
+    async def _append_many(self, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
@@ -0,0 +1,19 @@
+from app.config import get_settings
+from app.storage.base import ChatHistoryStore
+from app.storage.sqlite_store import SQLiteChatHistoryStore
+from app.storage.supabase_store import SupabaseChatHistoryStore
+
+settings = get_settings()
+
+
+def create_chat_history_store(backend: str) -> ChatHistoryStore:
+    """Build the chat history store named by settings.chat_history_backend"""
+    if backend == "supabase":
+        return SupabaseChatHistoryStore()
+    if backend == "sqlite":
+        return SQLiteChatHistoryStore(settings.sqlite_path, busy_timeout=settings.sqlite_busy_timeout)
+    raise ValueError(f"Unknown chat_history_backend '{backend}' (expected 'supabase' or 'sqlite')")
+
+
+# Singleton instance
+chat_history_store = create_chat_history_store(settings.chat_history_backend)
@@ -0,0 +1,100 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from app.storage.base import ChatHistoryStore, utc_timestamp
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_history (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_history_session_created ON chat_history(session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_chat_history_created_at ON chat_history(created_at);
+"""
+
+# Fixed SQL text, so sqlite3's per-connection statement cache prepares each query once
+FETCH_RECENT_SQL = (
+    "SELECT role, content FROM chat_history WHERE session_id = ? "
+    "ORDER BY created_at DESC, id DESC LIMIT ?"
+)
+INSERT_SQL = "INSERT INTO chat_history (session_id, role, content, created_at) VALUES (?, ?, ?, ?)"
+
+
+class SQLiteChatHistoryStore(ChatHistoryStore):
+    """
+    chat_history in a local SQLite file, for single-node deployments.
+    
+    The connection lives on one dedicated thread, so calls never block the event
+    loop and never share the connection across threads. WAL mode lets other
+    processes (backups, the retention tool) read while the app writes.
+    """
+    
+    name = "sqlite"
+    
+    def __init__(self, path: str, busy_timeout: float = 5.0, cache_size_kib: int = 8192):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.cache_size_kib = cache_size_kib
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    async def _run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(self._connect()))
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (on the store's thread) and create the schema"""
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # With WAL, NORMAL only risks the last commits on power loss, never corruption
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+    
+    async def _fetch_recent(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        def fetch(conn: sqlite3.Connection):
+            return conn.execute(FETCH_RECENT_SQL, (session_id, limit)).fetchall()
+        
+        rows = await self._run(fetch)
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+    
+    async def _append_many(self, rows: List[Dict[str, Any]]):
+        params = [
+            (row["session_id"], row["role"], row["content"], row.get("created_at") or utc_timestamp())
+            for row in rows
+        ]
+        
+        def insert(conn: sqlite3.Connection):
+            with conn:
+                conn.executemany(INSERT_SQL, params)
+        
+        await self._run(insert)
+    
+    async def close(self):
+        if self._executor is None:
+            return
+        
+        def close_connection(conn: sqlite3.Connection):
+            # Fold the WAL back into the main file so it doesn't linger between runs
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.close()
+        
+        if self._conn is not None:
+            await self._run(close_connection)
+            self._conn = None
+        self._executor.shutdown(wait=True)
+        self._executor = None
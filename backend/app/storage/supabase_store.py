@@ -0,0 +1,25 @@
+from typing import Any, Dict, List
+from app.database import get_supabase, run_db
+from app.storage.base import ChatHistoryStore
+
+
+class SupabaseChatHistoryStore(ChatHistoryStore):
+    """chat_history in the hosted Supabase project, called on the database thread pool"""
+    
+    name = "supabase"
+    
+    async def _fetch_recent(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        client = get_supabase()
+        response = await run_db(
+            lambda: client.table('chat_history')
+                .select('role, content')
+                .eq('session_id', session_id)
+                .order('created_at', desc=True)
+                .limit(limit)
+                .execute()
+        )
+        return list(reversed(response.data or []))
+    
+    async def _append_many(self, rows: List[Dict[str, Any]]):
+        client = get_supabase()
+        await run_db(lambda: client.table('chat_history').insert(rows).execute())
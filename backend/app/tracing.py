@@ -0,0 +1,244 @@
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+from app.config import get_settings
+from app.http_client import get_http_client
+
+settings = get_settings()
+
+
+class Span:
+    """One timed operation within a trace"""
+    
+    __slots__ = ("name", "span_id", "parent_id", "start", "end", "attributes")
+    
+    def __init__(self, name: str, parent_id: Optional[str], start: float, attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start = start
+        self.end: Optional[float] = None
+        self.attributes = attributes
+    
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+
+class Trace:
+    """Spans recorded while handling one sampled request"""
+    
+    def __init__(self, name: str):
+        self.trace_id = os.urandom(16).hex()
+        # Wall clock at the start, so perf_counter offsets can be exported as timestamps
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.finished = False
+        self.root = self.add(name, None, self.start, {})
+    
+    def add(self, name: str, parent_id: Optional[str], start: float, attributes: Dict[str, Any]) -> Span:
+        span = Span(name, parent_id, start, attributes)
+        if not self.finished:
+            self.spans.append(span)
+        return span
+    
+    def server_timing(self) -> str:
+        """Server-Timing header value: total time per span name for spans finished so far"""
+        totals: Dict[str, float] = {}
+        for span in self.spans[1:]:
+            if span.end is not None:
+                totals[span.name] = totals.get(span.name, 0.0) + span.end - span.start
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(entries)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "spans": [
+                {
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "start_unix_nano": int((self.wall_start + span.start - self.start) * 1e9),
+                    "end_unix_nano": int((self.wall_start + (span.end or span.start) - self.start) * 1e9),
+                    "duration_ms": round(span.duration * 1000, 3),
+                    "attributes": span.attributes
+                }
+                for span in self.spans
+            ]
+        }
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_parent: ContextVar[Optional[str]] = ContextVar("span_parent", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time the with-block as a child of the current span; a no-op outside a sampled request"""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    current = trace.add(name, _parent.get(), time.perf_counter(), attributes)
+    token = _parent.set(current.span_id)
+    try:
+        yield current
+    finally:
+        _parent.reset(token)
+        current.end = time.perf_counter()
+
+
+def record_span(name: str, start: float, end: float, **attributes: Any):
+    """Add an already-measured interval (perf_counter times) to the current trace"""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, _parent.get(), start, attributes).end = end
+
+
+class TraceExporter:
+    """Batches finished traces and writes them to a JSON-lines file or an OTLP/HTTP endpoint"""
+    
+    def __init__(self, kind: str, file_path: str, otlp_endpoint: str, service_name: str, flush_interval: float = 1.0, max_pending: int = 1000):
+        self.kind = kind
+        self.file_path = file_path
+        self.otlp_endpoint = otlp_endpoint
+        self.service_name = service_name
+        self.flush_interval = flush_interval
+        self._pending: Deque[Trace] = deque(maxlen=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"exported": 0, "failed": 0}
+    
+    @property
+    def enabled(self) -> bool:
+        return self.kind in ("file", "otlp")
+    
+    def export(self, trace: Trace):
+        if self.enabled:
+            self._pending.append(trace)
+    
+    async def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    async def flush(self):
+        batch = list(self._pending)
+        self._pending.clear()
+        if not batch:
+            return
+        try:
+            if self.kind == "file":
+                await asyncio.to_thread(self._write_file, batch)
+            else:
+                response = await get_http_client().post(self.otlp_endpoint, json=self._otlp_payload(batch))
+                response.raise_for_status()
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            print(f"Error exporting {len(batch)} traces: {e}")
+            return
+        self.stats["exported"] += len(batch)
+    
+    def _write_file(self, batch: List[Trace]):
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            for trace in batch:
+                f.write(json.dumps(trace.to_dict()) + "\n")
+    
+    def _otlp_payload(self, batch: List[Trace]) -> Dict[str, Any]:
+        """OTLP/HTTP JSON encoding (ExportTraceServiceRequest)"""
+        spans = []
+        for trace in batch:
+            for exported in trace.to_dict()["spans"]:
+                otlp_span = {
+                    "traceId": trace.trace_id,
+                    "spanId": exported["span_id"],
+                    "name": exported["name"],
+                    "kind": 1,
+                    "startTimeUnixNano": str(exported["start_unix_nano"]),
+                    "endTimeUnixNano": str(exported["end_unix_nano"]),
+                    "attributes": [
+                        {"key": key, "value": {"stringValue": str(value)}}
+                        for key, value in exported["attributes"].items()
+                    ]
+                }
+                if exported["parent_id"]:
+                    otlp_span["parentSpanId"] = exported["parent_id"]
+                spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": spans}]
+            }]
+        }
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that samples requests into traces and reports the spans finished
+    before the response headers in a Server-Timing header (visible in browser devtools).
+    """
+    
+    def __init__(self, app, sample_rate: float, exporter: TraceExporter, timing_allow_origin: str = "*"):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.timing_allow_origin = timing_allow_origin
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        
+        trace = Trace(f"{scope['method']} {scope['path']}")
+        trace_token = _trace.set(trace)
+        parent_token = _parent.set(trace.root.span_id)
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                headers.append((b"timing-allow-origin", self.timing_allow_origin.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _parent.reset(parent_token)
+            _trace.reset(trace_token)
+            trace.root.end = time.perf_counter()
+            route = scope.get("route")
+            trace.root.attributes["http.route"] = getattr(route, "path", scope["path"])
+            trace.finished = True
+            self.exporter.export(trace)
+
+
+# Singleton instance
+trace_exporter = TraceExporter(
+    kind=settings.tracing_exporter,
+    file_path=settings.tracing_file_path,
+    otlp_endpoint=settings.tracing_otlp_endpoint,
+    service_name=settings.tracing_service_name
+)
@@ -62,7 +62,9 @@ CREATE TABLE IF NOT EXISTS chat_history (
 CREATE INDEX IF NOT EXISTS idx_experiences_profile_id ON experiences(profile_id);
 CREATE INDEX IF NOT EXISTS idx_projects_profile_id ON projects(profile_id);
 CREATE INDEX IF NOT EXISTS idx_skills_profile_id ON skills(profile_id);
-CREATE INDEX IF NOT EXISTS idx_chat_history_session_id ON chat_history(session_id);
+-- Session lookups filter by session_id and order by created_at (see migrations/001_*)
+CREATE INDEX IF NOT EXISTS idx_chat_history_session_created ON chat_history(session_id, created_at);
+-- Age scans for retention (scripts/prune_chat_history.py)
 CREATE INDEX IF NOT EXISTS idx_chat_history_created_at ON chat_history(created_at);
 
 -- Insert sample profile data (you'll replace this with your actual data)
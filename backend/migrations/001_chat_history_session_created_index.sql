@@ -0,0 +1,23 @@
+-- Composite index for the chat history lookup.
+--
+-- Every chat turn on a cold session runs
+--   SELECT role, content FROM chat_history
+--   WHERE session_id = $1 ORDER BY created_at DESC LIMIT $2;
+-- With separate session_id and created_at indexes, Postgres fetches all of the
+-- session's rows and sorts them. An index on (session_id, created_at) returns
+-- the newest rows of one session directly, in order, and stops after LIMIT.
+--
+-- CONCURRENTLY builds the index without blocking inserts. It can't run inside a
+-- transaction block, so run this file statement by statement, e.g.
+--   psql "$DATABASE_URL" -f migrations/001_chat_history_session_created_index.sql
+-- (the Supabase SQL editor wraps a script in a transaction; paste one statement at a time there).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chat_history_session_created
+    ON chat_history (session_id, created_at);
+
+-- The composite index covers every lookup by session_id, so the single-column one only costs writes
+DROP INDEX CONCURRENTLY IF EXISTS idx_chat_history_session_id;
+
+-- idx_chat_history_created_at stays: scripts/prune_chat_history.py scans by age
+
+ANALYZE chat_history;
@@ -0,0 +1,67 @@
+"""
+Benchmark the per-request cost of building the chat prompt.
+
+"rebuild" renders the resume context and formats the system prompt on every
+call, as every chat turn used to. "memoized" is the full-context path, which
+serves the snapshot compiled once per resume version; "retrieved" builds the
+prompt from the top-k sections for one sample question.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import get_settings
+from app.services.chat_service import SYSTEM_PROMPT_TEMPLATE, chat_service
+from app.services.resume_service import render_resume_context, resume_service
+
+settings = get_settings()
+
+ITERATIONS = 20000
+
+
+def bench(label: str, fn) -> float:
+    """Run fn ITERATIONS times (best of 5) and print microseconds per call"""
+    best = min(timeit.repeat(fn, number=ITERATIONS, repeat=5))
+    per_call_us = best / ITERATIONS * 1_000_000
+    print(f"  {label:<40} {per_call_us:10.2f} µs/call")
+    return per_call_us
+
+
+def drive(coro):
+    """Run a coroutine that never suspends, without event loop overhead"""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("coroutine suspended")
+
+
+def main():
+    data = resume_service.resume_data
+
+    async def retrieved_prompt():
+        context = await resume_service.get_retrieved_context("tell me about your projects", settings.retrieval_top_k)
+        return SYSTEM_PROMPT_TEMPLATE.format(resume_context=context)
+
+    def rebuild_prompt():
+        SYSTEM_PROMPT_TEMPLATE.format(resume_context=render_resume_context(data))
+
+    print("=" * 60)
+    print(f"Resume version {resume_service.version}, context {len(resume_service.get_snapshot().context)} chars")
+    print("=" * 60)
+    before_ctx = bench("context: rebuild per request", lambda: render_resume_context(data))
+    after_ctx = bench("context: memoized snapshot", lambda: drive(resume_service.get_full_resume_context()))
+    before_prompt = bench("system prompt: rebuild per request", rebuild_prompt)
+    after_prompt = bench("system prompt: memoized per version", lambda: drive(chat_service._get_system_prompt("")))
+    bench("system prompt: retrieved top-k sections", lambda: drive(retrieved_prompt()))
+    print("-" * 60)
+    print(f"  context speedup:       {before_ctx / after_ctx:8.1f}x")
+    print(f"  system prompt speedup: {before_prompt / after_prompt:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Micro-benchmarks for the per-request resume, prompt and payload paths, with a
+regression gate against a stored baseline.
+
+Every benchmark runs against two datasets:
+  * real:   data/resume_knowledge.json
+  * scaled: the same resume grown to --projects projects and --faq FAQ
+            entries, to show how each path scales with the knowledge base
+
+Covered:
+  resume.*   ResumeService getters, bootstrap, full/retrieved context and
+             compiling a snapshot (the reload cost)
+  prompt.*   system prompt assembly (full and retrieved) and the full
+             Ollama message list for a turn with history
+  render.*   serializing and compressing each route payload (cache miss)
+  serve.*    answering a route from the rendered payload (cache hit)
+
+Like pytest-benchmark, each case is calibrated so one round takes at least
+--min-time seconds, then timed for --rounds rounds. Per-call min/median/mean/
+stddev are reported in microseconds. Results go to --output as JSON
+(data/benchmarks/results.json by default; data/benchmarks/ is gitignored).
+With --baseline, a case fails when its median is more than --threshold (a
+fraction) slower than the baseline median, and the script exits with 1.
+Without a path, --save-baseline and --baseline use data/benchmarks/baseline.json.
+
+    python scripts/benchmark_suite.py --save-baseline
+    python scripts/benchmark_suite.py --baseline --threshold 0.25
+"""
+
+import argparse
+import copy
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from starlette.requests import Request
+
+from app.api.cached_responses import conditional_response, render_json
+from app.config import get_settings
+from app.services.chat_service import chat_service
+from app.services.resume_service import compile_snapshot, resume_service
+
+settings = get_settings()
+
+BENCHMARK_DIR = Path(__file__).parent.parent / "data" / "benchmarks"
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results.json"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+
+ROUTE_PAYLOADS = ("profile", "experiences", "projects", "skills", "bootstrap")
+SAMPLE_QUESTION = "Which projects used React and real-time data?"
+SAMPLE_HISTORY = [
+    {"role": "user", "content": "What do you work on?"},
+    {"role": "assistant", "content": "Mostly full stack web apps and IoT projects."},
+]
+
+
+def drive(coro):
+    """Run a coroutine that never suspends, without event loop overhead"""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("coroutine suspended")
+
+
+def scale_resume(resume_data: Dict[str, Any], projects: int, faq: int) -> Dict[str, Any]:
+    """Copy of the resume padded with numbered variants of its projects and FAQ entries"""
+    scaled = copy.deepcopy(resume_data)
+    templates = resume_data.get("projects") or [{"name": "Project", "description": "A project.", "technologies": []}]
+    scaled["projects"] = [
+        {
+            **copy.deepcopy(templates[i % len(templates)]),
+            "name": f"{templates[i % len(templates)].get('name', 'Project')} {i + 1}",
+            "description": f"Variant {i + 1}: {templates[i % len(templates)].get('description', '')}"
+        }
+        for i in range(projects)
+    ]
+    answers = list((resume_data.get("faq_responses") or {"about_me": "About me."}).items())
+    scaled["faq_responses"] = {}
+    for i in range(faq):
+        key, answer = answers[i % len(answers)]
+        scaled["faq_responses"][f"{key}_{i + 1}"] = f"{answer} (variant {i + 1})"
+    return scaled
+
+
+def fake_request(accept_encoding: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode("latin-1"))]
+    })
+
+
+def measure(fn: Callable[[], Any], rounds: int, min_time: float) -> Dict[str, float]:
+    """Calibrate iterations per round, then time rounds; returns per-call stats in µs"""
+    fn()
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - started) / number * 1_000_000)
+    return {
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "mean_us": round(statistics.fmean(per_call), 3),
+        "stddev_us": round(statistics.stdev(per_call), 3) if len(per_call) > 1 else 0.0,
+        "iterations": number,
+        "rounds": rounds
+    }
+
+
+def cases(resume_data: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    """Benchmark name -> zero-argument callable, for the snapshot currently loaded"""
+    def prompt(mode: str):
+        def run():
+            settings.resume_context_mode = mode
+            return drive(chat_service._get_system_prompt(SAMPLE_QUESTION))
+        return run
+
+    def messages():
+        settings.resume_context_mode = "full"
+        return drive(chat_service._prepare_messages(SAMPLE_QUESTION, "bench", SAMPLE_HISTORY))
+
+    benchmarks = {
+        "resume.get_profile": lambda: drive(resume_service.get_profile()),
+        "resume.get_experiences": lambda: drive(resume_service.get_experiences()),
+        "resume.get_projects": lambda: drive(resume_service.get_projects()),
+        "resume.get_skills": lambda: drive(resume_service.get_skills()),
+        "resume.get_bootstrap": lambda: drive(resume_service.get_bootstrap()),
+        "resume.get_full_resume_context": lambda: drive(resume_service.get_full_resume_context()),
+        "resume.get_retrieved_context": lambda: drive(
+            resume_service.get_retrieved_context(SAMPLE_QUESTION, settings.retrieval_top_k)
+        ),
+        "resume.compile_snapshot": lambda: compile_snapshot(resume_data),
+        "prompt.system_full": prompt("full"),
+        "prompt.system_retrieved": prompt("retrieved"),
+        "prompt.messages": messages,
+    }
+
+    requests = {encoding: fake_request(encoding) for encoding in ("identity", "gzip, deflate, br")}
+    for name in ROUTE_PAYLOADS:
+        payload = drive(getattr(resume_service, f"get_{name}")())
+        rendered = render_json(payload)
+        benchmarks[f"render.{name}"] = lambda payload=payload: render_json(payload)
+        benchmarks[f"serve.{name}"] = lambda rendered=rendered: conditional_response(requests["gzip, deflate, br"], rendered)
+        benchmarks[f"serve.{name}.identity"] = lambda rendered=rendered: conditional_response(requests["identity"], rendered)
+    return benchmarks
+
+
+def run_suite(datasets: Dict[str, Dict[str, Any]], rounds: int, min_time: float, only: List[str]) -> Dict[str, Any]:
+    original_snapshot = resume_service.get_snapshot()
+    original_mode = settings.resume_context_mode
+    results: Dict[str, Dict[str, float]] = {}
+    dataset_info = {}
+    try:
+        for dataset, resume_data in datasets.items():
+            snapshot = compile_snapshot(resume_data)
+            resume_service._snapshot = snapshot
+            dataset_info[dataset] = {
+                "version": snapshot.version,
+                "projects": len(resume_data.get("projects", [])),
+                "faq_entries": len(resume_data.get("faq_responses", {})),
+                "context_chars": len(snapshot.context)
+            }
+            print(f"\n{dataset}: {dataset_info[dataset]['projects']} projects, "
+                  f"{dataset_info[dataset]['faq_entries']} FAQ entries, {len(snapshot.context)} context chars")
+            for name, fn in cases(resume_data).items():
+                key = f"{dataset}:{name}"
+                if only and not any(pattern in key for pattern in only):
+                    continue
+                results[key] = measure(fn, rounds, min_time)
+                print(f"  {name:<36} {results[key]['median_us']:12.2f} µs  (±{results[key]['stddev_us']:.2f})")
+    finally:
+        resume_service._snapshot = original_snapshot
+        settings.resume_context_mode = original_mode
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rounds": rounds,
+            "min_time": min_time,
+            "datasets": dataset_info
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print the change per case against the baseline; returns the regressed case names"""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['meta'].get('created_at', '?')} (threshold +{threshold:.0%}):")
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            print(f"  {key:<48} new")
+            continue
+        change = result["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        regressed = change > threshold
+        if regressed:
+            regressions.append(key)
+        print(f"  {'❌' if regressed else '✅'} {key:<46} {base['median_us']:10.2f} → {result['median_us']:10.2f} µs  {change:+7.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume, prompt and payload micro-benchmarks")
+    parser.add_argument("--projects", type=int, default=300, help="projects in the scaled resume")
+    parser.add_argument("--faq", type=int, default=300, help="FAQ entries in the scaled resume")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per round")
+    parser.add_argument("--only", action="append", default=[], help="run cases whose name contains this (repeatable)")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="where to write results")
+    parser.add_argument("--baseline", nargs="?", const=str(DEFAULT_BASELINE),
+                        help="baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed median slowdown, as a fraction")
+    parser.add_argument("--save-baseline", nargs="?", const=str(DEFAULT_BASELINE),
+                        help="also write these results as the new baseline")
+    args = parser.parse_args()
+
+    real = resume_service.resume_data
+    datasets = {"real": real, "scaled": scale_resume(real, args.projects, args.faq)}
+    current = run_suite(datasets, args.rounds, args.min_time, args.only)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(current, indent=2))
+    print(f"\nWrote {args.output}")
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save_baseline).write_text(json.dumps(current, indent=2))
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(current, json.loads(Path(args.baseline).read_text()), args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
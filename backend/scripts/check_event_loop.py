@@ -0,0 +1,133 @@
+"""
+Check that static endpoints stay fast while chat turns are in flight.
+
+Replaces Supabase with a client whose calls block for DB_DELAY seconds and
+Ollama with a mock that answers after LLM_DELAY seconds, runs the app with its
+lifespan (so the history writer flushes), starts CHAT_TURNS overlapping chat
+requests on existing sessions (so their history is read from the store) and
+polls /api/profile until they finish.
+If Supabase calls ran on the event loop, profile requests would queue behind
+them; with the thread-pool offload they stay in the low milliseconds. The
+check also fails if the chats stop reaching the store at all.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import database, http_client
+from app.config import get_settings
+from app.main import app
+from app.services.history_writer import history_writer
+from app.storage.factory import chat_history_store
+
+settings = get_settings()
+
+DB_DELAY = 0.3
+LLM_DELAY = 0.5
+CHAT_TURNS = 20
+CHAT_INTERVAL = 0.05
+PROBE_INTERVAL = 0.01
+MAX_PROFILE_LATENCY_MS = 100
+FLUSH_INTERVAL = 0.2
+
+
+class SlowQuery:
+    """Stand-in for a supabase-py query builder whose execute() blocks"""
+
+    def __init__(self, calls: dict):
+        self.calls = calls
+        self.kind = "select"
+
+    def __getattr__(self, name):
+        def build(*args, **kwargs):
+            if name in ("insert", "delete", "update", "upsert"):
+                self.kind = name
+            return self
+        return build
+
+    def execute(self):
+        time.sleep(DB_DELAY)
+        self.calls[self.kind] = self.calls.get(self.kind, 0) + 1
+        return type("Response", (), {"data": []})()
+
+
+class SlowSupabase:
+    def __init__(self):
+        self.calls: dict = {}
+
+    def table(self, name):
+        return SlowQuery(self.calls)
+
+
+async def fake_ollama(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(LLM_DELAY)
+    return httpx.Response(200, json={"message": {"role": "assistant", "content": "Hi!"}, "done": True})
+
+
+async def main():
+    if chat_history_store.name != "supabase":
+        sys.exit(f"❌ CHAT_HISTORY_BACKEND is {chat_history_store.name!r}; this check needs 'supabase'")
+    slow_supabase = SlowSupabase()
+    database.supabase = slow_supabase
+    # Set before the lifespan starts, which keeps an already open client
+    http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(fake_ollama))
+    settings.ollama_warmup_on_startup = False
+    history_writer.flush_interval = FLUSH_INTERVAL
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        latencies = []
+        chats_done = asyncio.Event()
+
+        async def probe_profile():
+            # Latency is measured from when each request was due, so time spent
+            # waiting for a blocked event loop counts against it
+            due = time.perf_counter()
+            while not chats_done.is_set():
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                response = await client.get("/api/profile")
+                latencies.append((time.perf_counter() - due) * 1000)
+                response.raise_for_status()
+                due = max(due + PROBE_INTERVAL, time.perf_counter())
+
+        async def send_chat(i: int):
+            await asyncio.sleep(i * CHAT_INTERVAL)
+            # A session the history cache hasn't seen, so its history is read from the store
+            response = await client.post("/api/chat", json={"message": f"question {i}", "session_id": f"check-{i}"})
+            response.raise_for_status()
+
+        probe = asyncio.create_task(probe_profile())
+        await asyncio.gather(*(send_chat(i) for i in range(CHAT_TURNS)))
+        chats_done.set()
+        await probe
+
+    p50 = statistics.median(latencies)
+    worst = max(latencies)
+    reads = slow_supabase.calls.get("select", 0)
+    writes = slow_supabase.calls.get("insert", 0)
+    print("=" * 60)
+    print(f"/api/profile during {CHAT_TURNS} concurrent chat turns")
+    print(f"  p50: {p50:.1f} ms   max: {worst:.1f} ms")
+    print(f"  Supabase calls: {reads} reads, {writes} inserts")
+    print("=" * 60)
+
+    if reads < CHAT_TURNS or writes < 1:
+        print(f"❌ Expected at least {CHAT_TURNS} history reads and one insert - the chats never reached the store")
+        sys.exit(1)
+    if worst > MAX_PROFILE_LATENCY_MS:
+        print(f"❌ Profile latency exceeded {MAX_PROFILE_LATENCY_MS} ms - the event loop is being blocked")
+        sys.exit(1)
+    print("✅ Event loop stayed responsive")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
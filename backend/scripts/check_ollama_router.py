@@ -0,0 +1,129 @@
+"""
+Check Ollama backend routing against several local stand-in servers.
+
+Starts BACKENDS fake Ollama servers (scripts/fake_ollama.py) and drives the
+app through them:
+  1. concurrent first turns are spread over all backends
+  2. follow-up turns of a session stay on the backend that served it
+  3. when that backend starts failing, turns fail over without errors and
+     the backend is ejected; once it recovers, a health probe brings it back
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import database
+from app.main import app
+from app.services.ollama_router import ollama_router
+from app.services.scheduler import llm_scheduler
+from fake_ollama import create_app, serve_in_thread
+
+BACKENDS = 3
+FIRST_PORT = 11601
+CONCURRENT_TURNS = 12
+HEALTH_INTERVAL = 0.2
+
+
+class EmptyQuery:
+    """Stand-in for a supabase-py query builder with no rows"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return type("Response", (), {"data": []})()
+
+
+class EmptySupabase:
+    def table(self, name):
+        return EmptyQuery()
+
+
+failures = []
+
+
+def check(condition: bool, message: str):
+    print(f"  {'✅' if condition else '❌'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def served_by(reply: str) -> str:
+    """The fake backends answer 'Hello from <name>.'"""
+    return reply.rsplit(" ", 1)[-1].rstrip(".")
+
+
+async def main():
+    database.supabase = EmptySupabase()
+    names = [chr(ord("a") + i) for i in range(BACKENDS)]
+    fakes = {name: create_app(name, token_delay=0.05) for name in names}
+    servers = [serve_in_thread(fake, FIRST_PORT + i) for i, fake in enumerate(fakes.values())]
+
+    ollama_router.set_urls([f"http://127.0.0.1:{FIRST_PORT + i}" for i in range(BACKENDS)])
+    ollama_router.health_interval = HEALTH_INTERVAL
+    llm_scheduler.max_in_flight = CONCURRENT_TURNS
+    await ollama_router.start()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        async def chat(message: str, session_id: str = None) -> dict:
+            response = await client.post("/api/chat", json={"message": message, "session_id": session_id})
+            response.raise_for_status()
+            return response.json()
+
+        print("Least-outstanding balancing")
+        replies = await asyncio.gather(*(chat(f"question {i}") for i in range(CONCURRENT_TURNS)))
+        counts = {name: fakes[name].state.chats for name in names}
+        print(f"  turns per backend: {counts}")
+        check(all(counts.values()), "every backend served some of the concurrent turns")
+
+        print("Session affinity")
+        session_id = replies[0]["session_id"]
+        home = served_by(replies[0]["response"])
+        followups = [served_by((await chat(f"follow-up {i}", session_id))["response"]) for i in range(3)]
+        check(followups == [home] * 3, f"follow-ups stayed on backend {home}: {followups}")
+
+        print("Failover and ejection")
+        fakes[home].state.failing = True
+        moved = [(await chat(f"during outage {i}", session_id)) for i in range(ollama_router.eject_after)]
+        check(all(served_by(r["response"]) != home for r in moved), f"turns moved off backend {home}")
+        backend = next(b for b in ollama_router.backends if b.url.endswith(str(FIRST_PORT + names.index(home))))
+        check(not backend.healthy, f"backend {home} was ejected")
+        stream = await client.post("/api/chat/stream", json={"message": "streamed during outage", "session_id": session_id})
+        check(stream.status_code == 200 and "event: done" in stream.text, "streaming turn failed over")
+
+        print("Recovery")
+        fakes[home].state.failing = False
+        deadline = time.perf_counter() + 5 * HEALTH_INTERVAL
+        while not backend.healthy and time.perf_counter() < deadline:
+            await asyncio.sleep(HEALTH_INTERVAL / 4)
+        check(backend.healthy, f"backend {home} rejoined after a successful health probe")
+
+        stats = (await client.get("/api/stats")).json()["ollama_backends"]
+
+    await ollama_router.stop()
+    for server in servers:
+        server.should_exit = True
+
+    print("=" * 60)
+    print(f"failovers: {stats['failovers']}   affinity hits: {stats['affinity_hits']}   misses: {stats['affinity_misses']}")
+    for backend in stats["backends"]:
+        print(f"  {backend['url']}: {backend['requests']} requests, {backend['errors']} errors, "
+              f"avg {backend['latency_ms_avg']} ms, healthy={backend['healthy']}")
+    print("=" * 60)
+
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ Routing, affinity and failover behave as expected")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
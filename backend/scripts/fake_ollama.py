@@ -0,0 +1,171 @@
+"""
+Stand-in Ollama server for local testing without a GPU.
+
+Implements the endpoints the backend uses (/api/tags, /api/generate and
+streaming or non-streaming /api/chat) and answers every chat with a fixed
+reply that names the server, so it is easy to see which backend served a turn.
+
+Timing follows a simple model of a real server: the first call pays
+--load-time (loading the model), each chat pays prompt tokens / --prefill-rate
+before the first token (prompt tokens are estimated as characters / 4), and
+then streams tokens at --decode-rate per second. --reply-tokens pads the reply
+with filler up to that many tokens, capped by the request's num_predict. The
+final chunk reports matching prompt_eval/eval counts and durations.
+
+Run one or more instances:
+    python scripts/fake_ollama.py --port 11501 --name a
+    python scripts/fake_ollama.py --port 11502 --name b
+then point the backend at them:
+    OLLAMA_BACKEND_URLS=http://127.0.0.1:11501,http://127.0.0.1:11502
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def estimate_prompt_tokens(messages: List[dict]) -> int:
+    return max(1, sum(len(m.get("content", "")) for m in messages) // 4)
+
+
+def reply_tokens_for(name: str, count: Optional[int], num_predict: Optional[int]) -> List[str]:
+    """The fixed greeting, padded with filler to count tokens and cut at num_predict"""
+    tokens = ["Hello", " from", f" {name}", "."]
+    if count:
+        tokens += [f" token{i}" for i in range(max(0, count - len(tokens)))]
+    if num_predict and num_predict > 0:
+        tokens = tokens[:num_predict]
+    return tokens
+
+
+def create_app(
+    name: str,
+    model: str = "gemma2:2b",
+    token_delay: float = 0.02,
+    prefill_rate: float = 0.0,
+    decode_rate: float = 0.0,
+    load_time: float = 0.0,
+    reply_tokens: Optional[int] = None
+) -> FastAPI:
+    """
+    Build a fake Ollama app; app.state.failing makes every call return 500.
+
+    decode_rate (tokens/s) overrides token_delay when set; a prefill_rate of 0
+    makes prefill instant.
+    """
+    app = FastAPI()
+    app.state.failing = False
+    app.state.chats = 0
+    app.state.loaded = load_time <= 0
+    delay_per_token = 1.0 / decode_rate if decode_rate > 0 else token_delay
+
+    def unavailable():
+        return JSONResponse(status_code=500, content={"error": f"{name} is failing"})
+
+    async def load() -> float:
+        """Seconds spent loading the model on this call (only the first one pays)"""
+        if app.state.loaded:
+            return 0.0
+        app.state.loaded = True
+        await asyncio.sleep(load_time)
+        return load_time
+
+    @app.get("/api/tags")
+    async def tags():
+        if app.state.failing:
+            return unavailable()
+        return {"models": [{"name": model, "model": model}]}
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        if app.state.failing:
+            return unavailable()
+        body = await request.json()
+        loaded_in = await load()
+        return {"model": body.get("model", model), "response": "", "done": True, "load_duration": int(loaded_in * 1e9)}
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        if app.state.failing:
+            return unavailable()
+        body = await request.json()
+        app.state.chats += 1
+        started = time.perf_counter()
+        options = body.get("options") or {}
+        tokens = reply_tokens_for(name, reply_tokens, options.get("num_predict"))
+        prompt_tokens = estimate_prompt_tokens(body.get("messages", []))
+        prefill_seconds = prompt_tokens / prefill_rate if prefill_rate > 0 else 0.0
+
+        def final(loaded_in: float) -> dict:
+            return {
+                "model": body.get("model", model),
+                "done": True,
+                "done_reason": "length" if len(tokens) == options.get("num_predict") else "stop",
+                "total_duration": int((time.perf_counter() - started) * 1e9),
+                "load_duration": int(loaded_in * 1e9),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(prefill_seconds * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": int(len(tokens) * delay_per_token * 1e9)
+            }
+
+        if body.get("stream"):
+            async def stream():
+                loaded_in = await load()
+                await asyncio.sleep(prefill_seconds)
+                for token in tokens:
+                    await asyncio.sleep(delay_per_token)
+                    yield json.dumps({"message": {"role": "assistant", "content": token}, "done": False}) + "\n"
+                yield json.dumps({**final(loaded_in), "message": {"role": "assistant", "content": ""}}) + "\n"
+            return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+        loaded_in = await load()
+        await asyncio.sleep(prefill_seconds + delay_per_token * len(tokens))
+        return {**final(loaded_in), "message": {"role": "assistant", "content": "".join(tokens)}}
+
+    return app
+
+
+def serve_in_thread(app: FastAPI, port: int, host: str = "127.0.0.1") -> uvicorn.Server:
+    """Start app in a background thread; set server.should_exit = True to stop it"""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="error"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Fake Ollama could not start on {host}:{port}")
+        time.sleep(0.01)
+    server.thread = thread
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--name", default="fake-ollama")
+    parser.add_argument("--model", default="gemma2:2b")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds per generated token")
+    parser.add_argument("--prefill-rate", type=float, default=0.0, help="prompt tokens per second (0 = instant)")
+    parser.add_argument("--decode-rate", type=float, default=0.0, help="generated tokens per second (overrides --token-delay)")
+    parser.add_argument("--load-time", type=float, default=0.0, help="seconds the first call spends loading the model")
+    parser.add_argument("--reply-tokens", type=int, default=None, help="pad replies to this many tokens")
+    args = parser.parse_args()
+
+    app = create_app(
+        args.name,
+        args.model,
+        token_delay=args.token_delay,
+        prefill_rate=args.prefill_rate,
+        decode_rate=args.decode_rate,
+        load_time=args.load_time,
+        reply_tokens=args.reply_tokens
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
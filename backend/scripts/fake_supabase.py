@@ -0,0 +1,201 @@
+"""
+In-memory stand-in for the Supabase REST API (PostgREST) for local load tests.
+
+Supports what supabase-py sends for the chat_history table and the scripts in
+this folder: select with column lists, eq/neq/gt/gte/lt/lte/in/is filters
+(also nested in or=/and= groups), order, limit/offset, inserts (single row or a list) and filtered deletes.
+Rows get an id and created_at like the real table. Every table starts empty.
+
+Run it and point the backend at it:
+    python scripts/fake_supabase.py --port 54321
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=fake.fake.fake uvicorn app.main:app
+Optional --latency adds a fixed delay to every call, like a remote database.
+"""
+
+import argparse
+import asyncio
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+# Any three dot-separated segments pass supabase-py's JWT shape check
+FAKE_KEY = "fake.supabase.key"
+
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+
+
+def _coerce(value: str, sample: Any) -> Any:
+    """Compare numbers as numbers; everything else (including ISO timestamps) as strings"""
+    if isinstance(sample, (int, float)) and not isinstance(sample, bool):
+        try:
+            return type(sample)(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _matches(row: Dict[str, Any], column: str, condition: str) -> bool:
+    op, _, raw = condition.partition(".")
+    if op == "not":
+        return not _matches(row, column, raw)
+    value = row.get(column)
+    if op == "is":
+        return value is None if raw == "null" else str(value).lower() == raw
+    if value is None:
+        return False
+    if op == "in":
+        options = [option.strip().strip('"') for option in raw.strip("()").split(",")]
+        return str(value) in options
+    expected = _coerce(raw.strip('"'), value)
+    if op == "eq":
+        return value == expected
+    if op == "neq":
+        return value != expected
+    if op == "gt":
+        return value > expected
+    if op == "gte":
+        return value >= expected
+    if op == "lt":
+        return value < expected
+    if op == "lte":
+        return value <= expected
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def _split_group(group: str) -> List[str]:
+    """Split "(a.eq.1,and(b.gt.2,c.lt.3))" into its top-level conditions"""
+    parts, depth, quoted, start = [], 0, False, 0
+    inner = group[1:-1]
+    for i, char in enumerate(inner):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and char == "," and depth == 0:
+            parts.append(inner[start:i])
+            start = i + 1
+    parts.append(inner[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _matches_group(row: Dict[str, Any], logic: str, group: str) -> bool:
+    results = []
+    for part in _split_group(group):
+        for nested in ("and", "or"):
+            if part.startswith(f"{nested}("):
+                results.append(_matches_group(row, nested, part[len(nested):]))
+                break
+        else:
+            column, _, condition = part.partition(".")
+            results.append(_matches(row, column, condition))
+    return any(results) if logic == "or" else all(results)
+
+
+def _filter(rows: List[Dict[str, Any]], params) -> List[Dict[str, Any]]:
+    for column, condition in params.multi_items():
+        if column in _RESERVED_PARAMS:
+            continue
+        if column in ("or", "and"):
+            rows = [row for row in rows if _matches_group(row, column, condition)]
+        else:
+            rows = [row for row in rows if _matches(row, column, condition)]
+    return rows
+
+
+def _order(rows: List[Dict[str, Any]], order: str) -> List[Dict[str, Any]]:
+    # Apply the last key first so earlier keys take precedence (stable sort)
+    for term in reversed(order.split(",")):
+        column, *modifiers = term.strip().split(".")
+        descending = "desc" in modifiers
+        rows = sorted(rows, key=lambda row: (row.get(column) is None, row.get(column)), reverse=descending)
+    return rows
+
+
+def _project(rows: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+    columns = [column.strip() for column in select.split(",") if column.strip()]
+    if not columns or "*" in columns:
+        return [dict(row) for row in rows]
+    return [{column: row.get(column) for column in columns} for row in rows]
+
+
+def create_app(latency: float = 0.0) -> FastAPI:
+    """Build the fake PostgREST app; app.state.tables holds the rows per table"""
+    app = FastAPI()
+    app.state.tables = {}
+    ids = itertools.count(1)
+
+    def table(name: str) -> List[Dict[str, Any]]:
+        return app.state.tables.setdefault(name, [])
+
+    def respond(request: Request, rows: List[Dict[str, Any]], status: int = 200) -> Response:
+        if "return=representation" not in request.headers.get("prefer", "") and request.method != "GET":
+            return Response(status_code=204 if status == 200 else status)
+        return JSONResponse(rows, status_code=status)
+
+    @app.get("/rest/v1/{name}")
+    async def select_rows(name: str, request: Request):
+        await asyncio.sleep(latency)
+        params = request.query_params
+        rows = _filter(table(name), params)
+        if "order" in params:
+            rows = _order(rows, params["order"])
+        offset = int(params.get("offset", 0))
+        limit = int(params["limit"]) if "limit" in params else None
+        total = len(rows)
+        rows = rows[offset:offset + limit if limit is not None else None]
+        # supabase-py reads the count for select(..., count="exact") from Content-Range
+        content_range = f"{offset}-{offset + len(rows) - 1}/{total}" if rows else f"*/{total}"
+        return JSONResponse(_project(rows, params.get("select", "*")), headers={"Content-Range": content_range})
+
+    @app.post("/rest/v1/{name}")
+    async def insert_rows(name: str, request: Request):
+        await asyncio.sleep(latency)
+        body = await request.json()
+        new_rows = body if isinstance(body, list) else [body]
+        now = datetime.now(timezone.utc).isoformat()
+        inserted = []
+        for row in new_rows:
+            row = {"id": next(ids), "created_at": now, **row}
+            table(name).append(row)
+            inserted.append(row)
+        return respond(request, inserted, status=201)
+
+    @app.delete("/rest/v1/{name}")
+    async def delete_rows(name: str, request: Request):
+        await asyncio.sleep(latency)
+        doomed = _filter(table(name), request.query_params)
+        doomed_ids = {id(row) for row in doomed}
+        app.state.tables[name] = [row for row in table(name) if id(row) not in doomed_ids]
+        return respond(request, doomed)
+
+    return app
+
+
+def serve_in_thread(app: FastAPI, port: int, host: str = "127.0.0.1") -> uvicorn.Server:
+    """Start app in a background thread; set server.should_exit = True to stop it"""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="error"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Fake Supabase could not start on {host}:{port}")
+        time.sleep(0.01)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Supabase REST (PostgREST) server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every call")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,364 @@
+"""
+Load-test the API against local Ollama and Supabase stand-ins.
+
+By default this starts scripts/fake_ollama.py, scripts/fake_supabase.py and
+the real app (uvicorn app.main:app) as subprocesses wired to each other, so
+nothing touches a real model or the hosted Supabase project. Then it drives
+the app with --concurrency workers for --duration seconds. Each request
+picks an endpoint from --mix. Pass --target to drive an already running
+server instead.
+
+Chat questions are drawn from three pools:
+  * instant:   answered from the resume without the model
+  * repeated:  a small set of common questions (answer cache and coalescing)
+  * unique:    numbered variants that always reach the model
+
+The report covers each endpoint: requests, errors, error rate, throughput,
+and p50/p95/p99/mean latency. Streaming chat also reports time to first
+token. --json writes the same numbers to a file, to compare runs.
+
+Examples:
+    python scripts/load_test.py --concurrency 16 --duration 30
+    python scripts/load_test.py --mix chat_stream=1 --decode-rate 40 --prefill-rate 800 --reply-tokens 120
+    python scripts/load_test.py --target http://localhost:8000 --mix bootstrap=1,profile=1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+SCRIPTS_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPTS_DIR.parent
+
+DEFAULT_MIX = "chat=3,chat_stream=3,bootstrap=2,profile=1"
+
+INSTANT_QUESTIONS = [
+    "What is your email?",
+    "What is your CGPA?",
+    "What is your LinkedIn?",
+]
+REPEATED_QUESTIONS = [
+    "What projects have you worked on?",
+    "What are your skills?",
+    "Tell me about your experience",
+    "What technologies do you use?",
+]
+UNIQUE_QUESTION = "How would you approach problem number {n} in a production system?"
+
+
+class EndpointStats:
+    """Latencies and errors for one endpoint"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.ttfts: List[float] = []
+        self.errors = 0
+        self.status_counts: Dict[str, int] = {}
+
+    def record(self, latency: float, status: str, ok: bool, ttft: Optional[float] = None):
+        self.latencies.append(latency)
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if ttft is not None:
+            self.ttfts.append(ttft)
+        if not ok:
+            self.errors += 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered) + 0.5 - 1e-9))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p95_ms": round(percentile(values, 95) * 1000, 1),
+        "p99_ms": round(percentile(values, 99) * 1000, 1),
+        "mean_ms": round(sum(values) / len(values) * 1000, 1) if values else 0.0
+    }
+
+
+def check_instant_questions():
+    """Every instant question must be answered by the intent router, or it measures the model"""
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.services.intent_router import intent_router
+
+    not_routed = [question for question in INSTANT_QUESTIONS if intent_router.classify(question) is None]
+    if not_routed:
+        raise SystemExit(f"INSTANT_QUESTIONS the intent router doesn't answer: {not_routed}")
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint '{name}' in --mix (choose from {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class QuestionPool:
+    def __init__(self, unique_ratio: float, instant_ratio: float):
+        self.unique_ratio = unique_ratio
+        self.instant_ratio = instant_ratio
+        self.counter = 0
+
+    def next(self) -> str:
+        roll = random.random()
+        if roll < self.instant_ratio:
+            return random.choice(INSTANT_QUESTIONS)
+        if roll < self.instant_ratio + self.unique_ratio:
+            self.counter += 1
+            return UNIQUE_QUESTION.format(n=self.counter)
+        return random.choice(REPEATED_QUESTIONS)
+
+
+async def get_json(client: httpx.AsyncClient, path: str, stats: EndpointStats, **_):
+    started = time.perf_counter()
+    response = await client.get(path)
+    stats.record(time.perf_counter() - started, str(response.status_code), response.status_code < 400)
+
+
+async def post_chat(client: httpx.AsyncClient, path: str, stats: EndpointStats, question: str, session_id: str):
+    started = time.perf_counter()
+    response = await client.post(path, json={"message": question, "session_id": session_id})
+    stats.record(time.perf_counter() - started, str(response.status_code), response.status_code < 400)
+
+
+async def post_chat_stream(client: httpx.AsyncClient, path: str, stats: EndpointStats, question: str, session_id: str):
+    """Consume the SSE stream; errors are non-2xx responses, error events or a missing done event"""
+    started = time.perf_counter()
+    ttft = None
+    event = None
+    outcome = "no_done"
+    async with client.stream("POST", path, json={"message": question, "session_id": session_id}) as response:
+        if response.status_code >= 400:
+            await response.aread()
+            stats.record(time.perf_counter() - started, str(response.status_code), False)
+            return
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                if event == "token" and ttft is None:
+                    ttft = time.perf_counter() - started
+                elif event in ("done", "error"):
+                    outcome = event
+    latency = time.perf_counter() - started
+    ok = outcome == "done"
+    stats.record(latency, str(response.status_code) if ok else outcome, ok, ttft)
+
+
+# name -> (handler, path)
+ENDPOINTS = {
+    "bootstrap": (get_json, "/api/bootstrap"),
+    "profile": (get_json, "/api/profile"),
+    "projects": (get_json, "/api/projects"),
+    "chat": (post_chat, "/api/chat"),
+    "chat_stream": (post_chat_stream, "/api/chat/stream"),
+}
+
+
+async def worker(worker_id: int, client: httpx.AsyncClient, weights: Dict[str, float], stats: Dict[str, EndpointStats],
+                 questions: QuestionPool, deadline: float, turns_per_session: int):
+    names = list(weights)
+    weight_values = list(weights.values())
+    turns = 0
+    session = 0
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights=weight_values)[0]
+        handler, path = ENDPOINTS[name]
+        # Each worker plays one visitor, starting a new conversation every few turns
+        if turns and turns % turns_per_session == 0:
+            session += 1
+        session_id = f"load-{worker_id}-{session}"
+        try:
+            await handler(client, path, stats[name], question=questions.next(), session_id=session_id)
+        except httpx.HTTPError as e:
+            stats[name].record(0.0, type(e).__name__, False)
+        if name.startswith("chat"):
+            turns += 1
+
+
+async def run_load(target: str, concurrency: int, duration: float, weights: Dict[str, float],
+                   questions: QuestionPool, turns_per_session: int, timeout: float) -> Dict:
+    stats = {name: EndpointStats() for name in weights}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            worker(i, client, weights, stats, questions, deadline, turns_per_session)
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    report = {"target": target, "concurrency": concurrency, "elapsed_s": round(elapsed, 2), "endpoints": {}}
+    for name, endpoint in stats.items():
+        count = len(endpoint.latencies)
+        entry = {
+            "requests": count,
+            "errors": endpoint.errors,
+            "error_rate": round(endpoint.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed, 2),
+            **summarize(endpoint.latencies),
+            "statuses": endpoint.status_counts
+        }
+        if endpoint.ttfts:
+            entry["ttft"] = summarize(endpoint.ttfts)
+        report["endpoints"][name] = entry
+    return report
+
+
+def print_report(report: Dict):
+    print(f"\n{report['concurrency']} workers for {report['elapsed_s']}s against {report['target']}\n")
+    header = f"  {'endpoint':<12} {'reqs':>6} {'errors':>7} {'err%':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8}"
+    print(header)
+    print("  " + "-" * (len(header) - 2))
+    for name, entry in report["endpoints"].items():
+        print(f"  {name:<12} {entry['requests']:>6} {entry['errors']:>7} {entry['error_rate'] * 100:>5.1f}% "
+              f"{entry['throughput_rps']:>8.2f} {entry['p50_ms']:>8.1f} {entry['p95_ms']:>8.1f} "
+              f"{entry['p99_ms']:>8.1f} {entry['mean_ms']:>8.1f}")
+    for name, entry in report["endpoints"].items():
+        if "ttft" in entry:
+            ttft = entry["ttft"]
+            print(f"\n  {name} time to first token: p50 {ttft['p50_ms']} ms, p95 {ttft['p95_ms']} ms, p99 {ttft['p99_ms']} ms")
+        non_ok = {status: n for status, n in entry["statuses"].items() if not status.startswith("2")}
+        if non_ok:
+            print(f"  {name} failures: {non_ok}")
+
+
+def spawn(args: List[str], env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env=env)
+
+
+async def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(timeout=1.0) as client:
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"Process for {url} exited with code {process.returncode}")
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise SystemExit(f"{url} did not come up within {timeout}s")
+
+
+async def start_stack(args) -> List[subprocess.Popen]:
+    """Start the stand-ins and the app; returns the processes to stop afterwards"""
+    from fake_supabase import FAKE_KEY
+
+    host = "127.0.0.1"
+    processes = []
+    ollama_urls = []
+    for i in range(args.ollama_backends):
+        port = args.ollama_port + i
+        processes.append(spawn([
+            str(SCRIPTS_DIR / "fake_ollama.py"), "--port", str(port), "--name", f"fake{i}",
+            "--prefill-rate", str(args.prefill_rate), "--decode-rate", str(args.decode_rate),
+            "--load-time", str(args.load_time),
+            *(["--reply-tokens", str(args.reply_tokens)] if args.reply_tokens else [])
+        ]))
+        ollama_urls.append(f"http://{host}:{port}")
+    processes.append(spawn([
+        str(SCRIPTS_DIR / "fake_supabase.py"), "--port", str(args.supabase_port),
+        "--latency", str(args.supabase_latency)
+    ]))
+
+    for url, process in zip(ollama_urls, processes):
+        await wait_until_ready(f"{url}/api/tags", process)
+    supabase_url = f"http://{host}:{args.supabase_port}"
+    await wait_until_ready(f"{supabase_url}/rest/v1/chat_history", processes[-1])
+
+    env = {
+        **os.environ,
+        "SUPABASE_URL": supabase_url,
+        "SUPABASE_KEY": FAKE_KEY,
+        "OLLAMA_URL": ollama_urls[0],
+        "OLLAMA_BACKEND_URLS": ",".join(ollama_urls),
+    }
+    app = spawn(["-m", "uvicorn", "app.main:app", "--host", host, "--port", str(args.app_port),
+                 "--log-level", "warning"], env=env)
+    processes.append(app)
+    await wait_until_ready(f"http://{host}:{args.app_port}/health", app, timeout=60.0)
+    return processes
+
+
+def stop_stack(processes: List[subprocess.Popen]):
+    """Stop the app first so its shutdown flush still reaches the stand-ins"""
+    for process in reversed(processes):
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Async load generator for the portfolio chat API")
+    parser.add_argument("--target", help="base URL of a running server (skips starting the local stack)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to generate load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--unique-ratio", type=float, default=0.5, help="share of chat questions that are unique")
+    parser.add_argument("--instant-ratio", type=float, default=0.1, help="share of chat questions with instant answers")
+    parser.add_argument("--turns-per-session", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    parser.add_argument("--seed", type=int, default=None)
+    stack = parser.add_argument_group("local stack (ignored with --target)")
+    stack.add_argument("--app-port", type=int, default=8765)
+    stack.add_argument("--supabase-port", type=int, default=54321)
+    stack.add_argument("--supabase-latency", type=float, default=0.0, help="seconds added to each Supabase call")
+    stack.add_argument("--ollama-port", type=int, default=11501)
+    stack.add_argument("--ollama-backends", type=int, default=1)
+    stack.add_argument("--prefill-rate", type=float, default=2000.0, help="fake Ollama prompt tokens per second")
+    stack.add_argument("--decode-rate", type=float, default=50.0, help="fake Ollama generated tokens per second")
+    stack.add_argument("--load-time", type=float, default=0.0, help="fake Ollama model load seconds (first call)")
+    stack.add_argument("--reply-tokens", type=int, default=60, help="fake Ollama reply length in tokens")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    weights = parse_mix(args.mix)
+    check_instant_questions()
+    questions = QuestionPool(args.unique_ratio, args.instant_ratio)
+
+    processes = []
+    target = args.target
+    if target is None:
+        processes = await start_stack(args)
+        target = f"http://127.0.0.1:{args.app_port}"
+    try:
+        print(f"Generating load for {args.duration}s ({args.mix})...")
+        report = await run_load(target, args.concurrency, args.duration, weights, questions,
+                                args.turns_per_session, args.timeout)
+    finally:
+        stop_stack(processes)
+
+    print_report(report)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2))
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    asyncio.run(main())
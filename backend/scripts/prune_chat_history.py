@@ -0,0 +1,251 @@
+"""
+Delete (or archive, then delete) chat sessions that have been idle longer than
+a given age.
+
+A session is expired when its newest message is older than --max-age-days.
+Sessions that are still active keep all of their messages. The tool walks
+old rows in (created_at, id) order (idx_chat_history_created_at) in batches
+of --batch-size rows; the id breaks ties, so rows that share a timestamp
+across a batch boundary are not skipped. For each batch it drops the
+sessions that turn out to be active and deletes the rest. Every delete is
+one short statement for at most one batch of sessions, so it never holds
+long locks. --pause spaces the batches out to leave room for live traffic.
+Only the sessions of the previous batch are remembered, so memory stays flat;
+an active session whose old messages are far apart may be checked (and
+counted as kept) more than once, as may an expired one in a dry run.
+
+Works against the configured chat history store (CHAT_HISTORY_BACKEND):
+Supabase through its REST API, or the local SQLite file.
+
+    python scripts/prune_chat_history.py --max-age-days 90 --dry-run
+    python scripts/prune_chat_history.py --max-age-days 90 --archive archive/chat_history.jsonl
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Keyset position in the old-row walk: (created_at, id) of the last row seen
+Cursor = Tuple[str, Any]
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Rows per archive read, and sessions per IN (...) filter (keeps REST URLs short)
+ARCHIVE_PAGE_SIZE = 1000
+SESSIONS_PER_FILTER = 100
+
+
+def chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class SupabaseHistory:
+    """chat_history through the Supabase REST API"""
+
+    def __init__(self):
+        from app.database import get_supabase
+        self.client = get_supabase()
+
+    def table(self):
+        return self.client.table("chat_history")
+
+    def old_rows(self, cutoff: str, after: Optional[Cursor], limit: int) -> List[Tuple[str, str, Any]]:
+        """(session_id, created_at, id) of rows older than cutoff, oldest first, after the cursor"""
+        query = self.table().select("id, session_id, created_at").lt("created_at", cutoff)
+        if after is not None:
+            created_at, row_id = after
+            query = query.or_(
+                f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt."{row_id}")'
+            )
+        rows = query.order("created_at").order("id").limit(limit).execute().data or []
+        return [(row["session_id"], row["created_at"], row["id"]) for row in rows]
+
+    def active_sessions(self, session_ids: List[str], cutoff: str) -> Set[str]:
+        active = set()
+        for group in chunks(session_ids, SESSIONS_PER_FILTER):
+            rows = self.table().select("session_id").in_("session_id", group).gte("created_at", cutoff).execute().data or []
+            active.update(row["session_id"] for row in rows)
+        return active
+
+    def session_rows(self, session_ids: List[str]) -> Iterable[Dict[str, Any]]:
+        for group in chunks(session_ids, SESSIONS_PER_FILTER):
+            offset = 0
+            while True:
+                rows = (
+                    self.table().select("*").in_("session_id", group)
+                    .order("created_at").range(offset, offset + ARCHIVE_PAGE_SIZE - 1).execute().data or []
+                )
+                yield from rows
+                if len(rows) < ARCHIVE_PAGE_SIZE:
+                    break
+                offset += ARCHIVE_PAGE_SIZE
+
+    def delete_sessions(self, session_ids: List[str]) -> int:
+        deleted = 0
+        for group in chunks(session_ids, SESSIONS_PER_FILTER):
+            deleted += len(self.table().delete().in_("session_id", group).execute().data or [])
+        return deleted
+
+    def close(self):
+        pass
+
+
+class SQLiteHistory:
+    """chat_history in the local SQLite file (WAL, so the running app keeps reading and writing)"""
+
+    def __init__(self, path: str):
+        if not Path(path).exists():
+            raise SystemExit(f"No SQLite chat history at {path}")
+        self.conn = sqlite3.connect(path, timeout=settings.sqlite_busy_timeout)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+
+    def old_rows(self, cutoff: str, after: Optional[Cursor], limit: int) -> List[Tuple[str, str, Any]]:
+        created_at, row_id = after or ("", 0)
+        return self.conn.execute(
+            "SELECT session_id, created_at, id FROM chat_history "
+            "WHERE created_at < ? AND (created_at > ? OR (created_at = ? AND id > ?)) "
+            "ORDER BY created_at, id LIMIT ?",
+            (cutoff, created_at, created_at, row_id, limit)
+        ).fetchall()
+
+    def _in(self, session_ids: List[str]) -> str:
+        return ",".join("?" * len(session_ids))
+
+    def active_sessions(self, session_ids: List[str], cutoff: str) -> Set[str]:
+        rows = self.conn.execute(
+            f"SELECT DISTINCT session_id FROM chat_history WHERE session_id IN ({self._in(session_ids)}) AND created_at >= ?",
+            (*session_ids, cutoff)
+        ).fetchall()
+        return {session_id for session_id, in rows}
+
+    def session_rows(self, session_ids: List[str]) -> Iterable[Dict[str, Any]]:
+        cursor = self.conn.execute(
+            f"SELECT id, session_id, role, content, created_at FROM chat_history "
+            f"WHERE session_id IN ({self._in(session_ids)}) ORDER BY created_at, id",
+            session_ids
+        )
+        columns = [column[0] for column in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+
+    def delete_sessions(self, session_ids: List[str]) -> int:
+        with self.conn:
+            return self.conn.execute(
+                f"DELETE FROM chat_history WHERE session_id IN ({self._in(session_ids)})", session_ids
+            ).rowcount
+
+    def close(self):
+        self.conn.close()
+
+
+def open_history(backend: str, sqlite_path: str):
+    if backend == "sqlite":
+        return SQLiteHistory(sqlite_path)
+    if backend == "supabase":
+        return SupabaseHistory()
+    raise SystemExit(f"Unknown backend '{backend}' (expected 'supabase' or 'sqlite')")
+
+
+def prune(history, cutoff: str, batch_size: int, pause: float, archive_path: Optional[str], dry_run: bool) -> Dict[str, Any]:
+    """Walk rows older than cutoff and remove the sessions with no newer messages"""
+    archive = open(archive_path, "a", encoding="utf-8") if archive_path and not dry_run else None
+    # Verdicts for the previous batch's sessions (True = expired), for rows that
+    # continue across the batch boundary. Expired sessions are deleted, so only
+    # active ones (or anything, in a dry run) can turn up again further on.
+    previous: Dict[str, bool] = {}
+    cursor: Optional[Cursor] = None
+    stats = {"batches": 0, "sessions": 0, "active_sessions_skipped": 0, "rows": 0, "archived": 0}
+    started = time.perf_counter()
+    try:
+        while True:
+            old = history.old_rows(cutoff, cursor, batch_size)
+            if not old:
+                break
+            # Keyset cursor: deleted rows vanish and active sessions' old rows are stepped over
+            cursor = old[-1][1:]
+            candidates = list(dict.fromkeys(session_id for session_id, _, _ in old if session_id not in previous))
+            active = history.active_sessions(candidates, cutoff) if candidates else set()
+            expired = [session_id for session_id in candidates if session_id not in active]
+            stats["active_sessions_skipped"] += len(active)
+            previous = {
+                session_id: previous[session_id] if session_id in previous else session_id not in active
+                for session_id, _, _ in old
+            }
+
+            batch_started = time.perf_counter()
+            if dry_run:
+                # Nothing is deleted, so count each expired row as the walk reaches it
+                rows = sum(1 for session_id, _, _ in old if previous[session_id])
+            elif expired:
+                if archive is not None:
+                    for row in history.session_rows(expired):
+                        archive.write(json.dumps(row, default=str) + "\n")
+                        stats["archived"] += 1
+                    archive.flush()
+                rows = history.delete_sessions(expired)
+            else:
+                rows = 0
+            stats["sessions"] += len(expired)
+            stats["rows"] += rows
+            stats["batches"] += 1
+
+            batch_seconds = time.perf_counter() - batch_started
+            total_seconds = time.perf_counter() - started
+            print(f"  batch {stats['batches']}: {len(expired)} sessions, {rows} rows "
+                  f"({rows / batch_seconds if batch_seconds else 0:.0f} rows/s); "
+                  f"total {stats['rows']} rows, {stats['rows'] / total_seconds:.0f} rows/s")
+            if pause > 0:
+                time.sleep(pause)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    stats["rows_per_second"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive or delete idle chat sessions in bounded batches")
+    parser.add_argument("--max-age-days", type=float, required=True, help="remove sessions idle longer than this")
+    parser.add_argument("--batch-size", type=int, default=500, help="old rows scanned per batch")
+    parser.add_argument("--pause", type=float, default=0.1, help="seconds to sleep between batches")
+    parser.add_argument("--archive", help="append removed rows to this JSON-lines file before deleting")
+    parser.add_argument("--dry-run", action="store_true", help="count what would be removed without deleting")
+    parser.add_argument("--backend", default=settings.chat_history_backend, choices=("supabase", "sqlite"))
+    parser.add_argument("--sqlite-path", default=settings.sqlite_path)
+    args = parser.parse_args()
+
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=args.max_age_days)).isoformat()
+    print("=" * 60)
+    print(f"{'Dry run: counting' if args.dry_run else 'Pruning'} {args.backend} sessions idle since {cutoff}")
+    print("=" * 60)
+
+    history = open_history(args.backend, args.sqlite_path)
+    try:
+        stats = prune(history, cutoff, args.batch_size, args.pause, args.archive, args.dry_run)
+    finally:
+        history.close()
+
+    print("-" * 60)
+    verb = "would remove" if args.dry_run else "removed"
+    print(f"  {verb} {stats['rows']} rows from {stats['sessions']} sessions in {stats['seconds']}s "
+          f"({stats['rows_per_second']} rows/s)")
+    print(f"  kept {stats['active_sessions_skipped']} active sessions with old messages")
+    if stats["archived"]:
+        print(f"  archived {stats['archived']} rows to {args.archive}")
+
+
+if __name__ == "__main__":
+    main()
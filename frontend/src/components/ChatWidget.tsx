@@ -8,6 +8,7 @@ const ChatWidget: React.FC = () => {
     const [messages, setMessages] = useState<ChatMessage[]>([]);
     const [inputValue, setInputValue] = useState('');
     const [isLoading, setIsLoading] = useState(false);
+    const [isStreaming, setIsStreaming] = useState(false);
     const [sessionId, setSessionId] = useState<string | undefined>();
     const messagesEndRef = useRef<HTMLDivElement>(null);
 
@@ -19,6 +20,11 @@ const ChatWidget: React.FC = () => {
         scrollToBottom();
     }, [messages]);
 
+    const openChat = () => {
+        setIsOpen(true);
+        apiService.warmChat().catch(() => undefined);
+    };
+
     const handleSendMessage = async () => {
         if (!inputValue.trim() || isLoading) return;
 
@@ -32,24 +38,33 @@ const ChatWidget: React.FC = () => {
         setIsLoading(true);
 
         try {
-            const response = await apiService.sendChatMessage(inputValue, sessionId);
+            let started = false;
+            const stats = await apiService.streamChatMessage(inputValue, sessionId, {
+                onToken: (content) => {
+                    if (!started) {
+                        started = true;
+                        setIsStreaming(true);
+                        setMessages((prev) => [...prev, { role: 'assistant', content }]);
+                        return;
+                    }
+                    setMessages((prev) => {
+                        const last = prev[prev.length - 1];
+                        return [...prev.slice(0, -1), { ...last, content: last.content + content }];
+                    });
+                },
+            });
 
             if (!sessionId) {
-                setSessionId(response.session_id);
+                setSessionId(stats.session_id);
             }
-
-            const aiMessage: ChatMessage = {
-                role: 'assistant',
-                content: response.response,
-            };
-
-            setMessages((prev) => [...prev, aiMessage]);
         } catch (error) {
             console.error('Chat error:', error);
             let errorMessageContent = 'Sorry, I encountered an error. Please try again.';
 
             if (error instanceof Error) {
-                if (error.message.includes('504') || error.message.includes('timeout')) {
+                if (error.message.includes('503')) {
+                    errorMessageContent = 'The assistant is busy answering other visitors right now. Please try again in a few seconds.';
+                } else if (error.message.includes('504') || error.message.includes('timeout')) {
                     errorMessageContent = 'The AI service is taking longer than expected. Please try again later.';
                 } else if (error.message.includes('500')) {
                     errorMessageContent = 'I am having trouble connecting to the AI service. Please try again later.';
@@ -63,6 +78,7 @@ const ChatWidget: React.FC = () => {
             setMessages((prev) => [...prev, errorMessage]);
         } finally {
             setIsLoading(false);
+            setIsStreaming(false);
         }
     };
 
@@ -76,7 +92,7 @@ const ChatWidget: React.FC = () => {
     return (
         <div className="chat-widget">
             {!isOpen && (
-                <button className="chat-toggle" onClick={() => setIsOpen(true)}>
+                <button className="chat-toggle" onClick={openChat}>
                     <svg width="24" height="24" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                         <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M8 10h.01M12 10h.01M16 10h.01M9 16H5a2 2 0 01-2-2V6a2 2 0 012-2h14a2 2 0 012 2v8a2 2 0 01-2 2h-5l-5 5v-5z" />
                     </svg>
@@ -125,7 +141,7 @@ const ChatWidget: React.FC = () => {
                                 </div>
                             </div>
                         ))}
-                        {isLoading && (
+                        {isLoading && !isStreaming && (
                             <div className="message assistant">
                                 <div className="message-content typing">
                                     <span></span>
@@ -1,4 +1,4 @@
-import type { Profile, Experience, Project, Skill, ChatRequest, ChatResponse } from '../types';
+import type { Bootstrap, Profile, Experience, Project, Skill, ChatRequest, ChatResponse, ChatStreamDone, ChatStreamHandlers } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL
     ? `${import.meta.env.VITE_API_URL}/api`
@@ -13,20 +13,39 @@ class ApiService {
         return response.json();
     }
 
+    private bootstrapPromise?: Promise<Bootstrap>;
+
+    // One request for every portfolio section; concurrent callers share it and
+    // the browser revalidates it with the ETag the backend sends
+    async getBootstrap(): Promise<Bootstrap> {
+        if (!this.bootstrapPromise) {
+            this.bootstrapPromise = this.fetchData<Bootstrap>('/bootstrap').catch((error) => {
+                this.bootstrapPromise = undefined;
+                throw error;
+            });
+        }
+        return this.bootstrapPromise;
+    }
+
     async getProfile(): Promise<Profile> {
-        return this.fetchData<Profile>('/profile');
+        return (await this.getBootstrap()).profile;
     }
 
     async getExperiences(): Promise<Experience[]> {
-        return this.fetchData<Experience[]>('/experiences');
+        return (await this.getBootstrap()).experiences;
     }
 
     async getProjects(): Promise<Project[]> {
-        return this.fetchData<Project[]>('/projects');
+        return (await this.getBootstrap()).projects;
     }
 
     async getSkills(): Promise<Skill[]> {
-        return this.fetchData<Skill[]>('/skills');
+        return (await this.getBootstrap()).skills;
+    }
+
+    // Ask the backend to start loading the model; fire-and-forget when the chat opens
+    async warmChat(): Promise<void> {
+        await fetch(`${API_BASE_URL}/chat/warm`, { method: 'POST' });
     }
 
     async sendChatMessage(message: string, sessionId?: string): Promise<ChatResponse> {
@@ -42,11 +61,66 @@ class ApiService {
         });
 
         if (!response.ok) {
-            throw new Error(`Chat API Error: ${response.statusText}`);
+            throw new Error(`Chat API Error: ${response.status} ${response.statusText}`);
         }
 
         return response.json();
     }
+
+    async streamChatMessage(message: string, sessionId: string | undefined, handlers: ChatStreamHandlers): Promise<ChatStreamDone> {
+        const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+            },
+            body: JSON.stringify({
+                message,
+                session_id: sessionId,
+            } as ChatRequest),
+        });
+
+        if (!response.ok || !response.body) {
+            throw new Error(`Chat API Error: ${response.status} ${response.statusText}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary = buffer.indexOf('\n\n');
+            while (boundary !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                boundary = buffer.indexOf('\n\n');
+
+                let event = 'message';
+                let data = '';
+                for (const line of frame.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (!data) continue;
+
+                const payload = JSON.parse(data);
+                if (event === 'token') {
+                    handlers.onToken(payload.content);
+                } else if (event === 'done') {
+                    handlers.onDone?.(payload);
+                    return payload as ChatStreamDone;
+                } else if (event === 'error') {
+                    throw new Error(payload.message);
+                }
+            }
+        }
+
+        throw new Error('Chat stream ended unexpectedly');
+    }
 }
 
 export const apiService = new ApiService();
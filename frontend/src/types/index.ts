@@ -45,6 +45,14 @@ export interface Skill {
   created_at: string;
 }
 
+export interface Bootstrap {
+  version: string;
+  profile: Profile;
+  experiences: Experience[];
+  projects: Project[];
+  skills: Skill[];
+}
+
 export interface ChatMessage {
   role: 'user' | 'assistant';
   content: string;
@@ -59,3 +67,18 @@ export interface ChatResponse {
   response: string;
   session_id: string;
 }
+
+export interface ChatStreamDone {
+  session_id: string;
+  time_to_first_token_ms: number | null;
+  total_time_ms: number;
+  eval_count?: number;
+  prompt_eval_count?: number;
+  question_class?: 'short' | 'list' | 'open';
+  source?: 'model' | 'intent' | 'cache';
+}
+
+export interface ChatStreamHandlers {
+  onToken: (content: string) => void;
+  onDone?: (stats: ChatStreamDone) => void;
+}